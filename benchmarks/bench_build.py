@@ -0,0 +1,81 @@
+# Full vs incremental runs of the post preview renderer on a synthetic blog.
+#
+#   python -m benchmarks.bench_build [num_posts]
+#
+# "one post edited" is the save-a-post case: only that post's page is
+# rewritten, everything else is skipped on stat + manifest. Retitling it
+# rewrites the preview index as well.
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.post_manager import PostManager
+from models.site_builder import SiteBuilder
+
+# {n} makes every post's blocks distinct, so the renderer's block cache
+# doesn't turn the full build into lookups
+BODY = """Lorem ipsum dolor sit amet {n}, *consectetur* adipiscing elit, sed do eiusmod.
+
+## Section
+
+- item one
+- item two with `code`
+
+```python
+def hello(name):
+    return f"Hello {{name}} {n}"
+```
+
+| a | b |
+|---|---|
+| {n} | 2 |
+
+"""
+
+
+def make_site(root, count):
+    posts_dir = os.path.join(root, 'content', 'posts')
+    os.makedirs(posts_dir)
+    for i in range(count):
+        with open(os.path.join(posts_dir, f'post-{i:05d}.md'), 'w', encoding='utf-8') as f:
+            f.write(f"---\ntitle: Post {i}\ndate: 2024-01-{i % 28 + 1:02d}\n---\n\n"
+                    + "".join(BODY.format(n=i * 4 + k) for k in range(4)))
+    return posts_dir
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    report = fn()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:9.1f} ms  "
+          f"(written {len(report.written)}, skipped {report.skipped})")
+    return report
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as root:
+        posts_dir = make_site(root, count)
+        manager = PostManager(root)
+        builder = SiteBuilder(manager, os.path.join(root, '_site'))
+        print(f"{count} synthetic posts in {root}")
+        timed("full build", lambda: builder.build(full=True))
+        timed("no-op rebuild", builder.build)
+
+        path = os.path.join(posts_dir, 'post-00042.md')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("\nOne more paragraph.\n")
+        timed("one post edited", builder.build)
+
+        with open(path, 'r+', encoding='utf-8') as f:
+            text = f.read().replace("title: Post 42", "title: Post 42 (renamed)")
+            f.seek(0)
+            f.write(text)
+            f.truncate()
+        timed("one post retitled", builder.build)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# Process spawns and latency for a typical GitTab session
+# (status -> diff -> stage -> status -> staged diff -> commit -> status),
+# with the pre-batching GitManager behaviour as the baseline. Processes are
+# counted as they start, by git subcommand. Here that is 12.0 before and
+# 9.1 after per session: the version checks and `git diff` runs go away,
+# while both cat-file pipes restart twice a session because staging and
+# committing rewrite .git/index.
+#
+#   python -m benchmarks.bench_git
+import collections
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.git_manager import GitManager
+
+
+class LegacyGitManager(GitManager):
+    # Version check on every status call and a `git diff` process per click
+    def get_status(self):
+        GitManager._version_cache.clear()
+        return super().get_status()
+
+    def _diff_from_blobs(self, filepath, staged):
+        return None
+
+
+def make_repo(root, files=50):
+    subprocess.run(['git', 'init', '-q', root], check=True)
+    subprocess.run(['git', '-C', root, 'config', 'user.email', 'bench@example.com'], check=True)
+    subprocess.run(['git', '-C', root, 'config', 'user.name', 'bench'], check=True)
+    os.makedirs(os.path.join(root, 'content', 'posts'))
+    for i in range(files):
+        with open(os.path.join(root, 'content', 'posts', f'post-{i}.md'), 'w') as f:
+            f.write(f"---\ntitle: Post {i}\n---\n" + "line\n" * 200)
+    subprocess.run(['git', '-C', root, 'add', '-A'], check=True)
+    subprocess.run(['git', '-C', root, 'commit', '-qm', 'init'], check=True)
+
+
+def session(manager, root, round_no):
+    path = f'content/posts/post-{round_no}.md'
+    with open(os.path.join(root, path), 'a') as f:
+        f.write(f"edit {round_no}\n")
+    manager.get_status()
+    manager.get_diff(path)
+    manager.get_diff(path)          # clicking the same file again
+    manager.stage_file(path)
+    manager.get_status()
+    manager.get_diff(path, staged=True)
+    manager.commit(f"edit {round_no}")
+    manager.get_status()
+
+
+class CountingPopen(subprocess.Popen):
+    # Every process started, by git subcommand (subprocess.run goes through
+    # Popen too), so nothing the managers forget to count is missed
+    counts = collections.Counter()
+
+    def __init__(self, args, *rest, **kwargs):
+        CountingPopen.counts[_subcommand(args)] += 1
+        super().__init__(args, *rest, **kwargs)
+
+
+def _subcommand(args):
+    # 'status' for ['git', '-c', 'k=v', '--no-optional-locks', 'status', ...]
+    words = iter(args[1:])
+    for word in words:
+        if word == '-c':
+            next(words, None)
+        elif not word.startswith('-'):
+            return word
+    return args[-1]
+
+
+def run(cls, rounds=10):
+    with tempfile.TemporaryDirectory() as root:
+        make_repo(root)
+        manager = cls(root)
+        CountingPopen.counts.clear()
+        subprocess.Popen = CountingPopen
+        try:
+            start = time.perf_counter()
+            for i in range(rounds):
+                session(manager, root, i)
+            elapsed = time.perf_counter() - start
+        finally:
+            subprocess.Popen = CountingPopen.__bases__[0]
+        counts = dict(CountingPopen.counts)
+        manager.close()
+    return sum(counts.values()) / rounds, elapsed / rounds * 1000, counts
+
+
+def main():
+    for label, cls in (("before (legacy)", LegacyGitManager), ("after (batched)", GitManager)):
+        spawns, ms, counts = run(cls)
+        print(f"{label:<18} {spawns:5.1f} processes/session  {ms:7.1f} ms/session")
+        print("    " + ", ".join(f"{name} {n}" for name, n in sorted(counts.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# LinkChecker over a synthetic blog, with external URLs answered by a local
+# stand-in server (so the numbers don't depend on the network).
+#
+#   python -m benchmarks.bench_links [num_posts]
+#
+# Every post links a few real images, other posts and external URLs, plus
+# one broken reference; the report must find exactly those.
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.post_manager import PostManager
+from models.link_checker import LinkChecker, HttpChecker, MISSING, BROKEN
+
+# Distinct external URLs; every DEAD_EVERY-th one answers 404
+URLS = 200
+DEAD_EVERY = 50
+
+
+class StandIn(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        code = 404 if self.path.startswith('/dead') else 200
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def make_site(root, count, base_url):
+    posts_dir = os.path.join(root, 'content', 'posts')
+    images_dir = os.path.join(root, 'content', 'images')
+    os.makedirs(posts_dir)
+    os.makedirs(images_dir)
+    for i in range(100):
+        open(os.path.join(images_dir, f'img-{i}.png'), 'wb').close()
+    for i in range(count):
+        n = i % URLS
+        url = f"{base_url}/{'dead' if n % DEAD_EVERY == 0 else 'ok'}/{n}"
+        body = (f"![figure](../images/img-{i % 100}.png)\n\n"
+                f"See [the previous post](post-{max(i - 1, 0):05d}.html) and [this]({url}).\n\n"
+                f"```\n[not a link](nowhere.md)\n```\n\n"
+                f"![missing](../images/gone-{i}.png)\n")
+        with open(os.path.join(posts_dir, f'post-{i:05d}.md'), 'w', encoding='utf-8') as f:
+            f.write(f"---\ntitle: Post {i}\ndate: 2024-01-{i % 28 + 1:02d}\n---\n\n{body}")
+    with open(os.path.join(root, 'data.json'), 'w', encoding='utf-8') as f:
+        json.dump({'projects': [{'name': 'ok', 'link': f"{base_url}/ok/project"},
+                                {'name': 'local', 'link': 'content/images/img-1.png'}]}, f)
+
+
+def timed(label, checker):
+    start = time.perf_counter()
+    report = checker.check()
+    counts = {}
+    for issue in report.issues:
+        counts[issue.status] = counts.get(issue.status, 0) + 1
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:9.1f} ms  "
+          f"({report.links} links, {report.external} external, issues {counts})")
+    return report
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            make_site(root, count, base_url)
+            manager = PostManager(root)
+            manager.get_posts()
+            checker = LinkChecker(manager)
+            print(f"{count} synthetic posts in {root}, stand-in server at {base_url}")
+            report = timed("local only, cold", checker)
+            assert sum(i.status == MISSING for i in report.issues) == count
+            timed("local only, warm", checker)
+            checker.url_checker = HttpChecker(timeout=2)
+            report = timed("with external URLs", checker)
+            dead = sum(1 for i in range(count) if (i % URLS) % DEAD_EVERY == 0)
+            assert sum(i.status == BROKEN for i in report.issues) == dead
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Full post preview renders (SiteBuilder) in-process vs spread over a
+# process pool, and a check that every page is byte-identical either way.
+#
+#   python -m benchmarks.bench_render_pool [num_posts]
+#
+# Worker counts above the machine's core count are skipped.
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_build import make_site
+from models.post_manager import PostManager
+from models.site_builder import SiteBuilder
+
+
+def tree_digest(root):
+    digest = hashlib.sha1()
+    for dirpath, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as root:
+        make_site(root, count)
+        manager = PostManager(root)
+        manager.get_posts()
+        print(f"{count} synthetic posts, {cores} core(s)")
+        baseline = None
+        serial_ms = None
+        for workers in sorted({1, 2, 4, 8, cores}):
+            if workers > cores:
+                continue
+            out = os.path.join(root, f'_site_{workers}')
+            builder = SiteBuilder(manager, out, workers=workers)
+            start = time.perf_counter()
+            report = builder.build(full=True)
+            ms = (time.perf_counter() - start) * 1000
+            serial_ms = serial_ms or ms
+            digest = tree_digest(out)
+            baseline = baseline or digest
+            print(f"{workers:>2} worker(s) {ms:10.1f} ms  CPU {report.cpu:7.2f}s  speedup {serial_ms / ms:4.2f}x  "
+                  f"{'identical' if digest == baseline else 'OUTPUT DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
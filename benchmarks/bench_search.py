@@ -0,0 +1,54 @@
+# Build the full-text index over a synthetic posts tree and time queries.
+#
+#   python -m benchmarks.bench_search [num_posts]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.post_manager import PostManager
+
+WORDS = ("python qt markdown render git commit branch index cache thread pool "
+         "latency portfolio design layout image gallery project resume server "
+         "deploy static site blog post draft title excerpt tag search token").split()
+
+
+def make_tree(root, count):
+    rng = random.Random(42)
+    posts_dir = os.path.join(root, 'content', 'posts')
+    os.makedirs(posts_dir)
+    for i in range(count):
+        body = ' '.join(rng.choice(WORDS) for _ in range(400))
+        with open(os.path.join(posts_dir, f'post-{i:05d}.md'), 'w', encoding='utf-8') as f:
+            f.write(f"---\ntitle: {rng.choice(WORDS)} {rng.choice(WORDS)} {i}\n"
+                    f"date: 2024-01-01\ntags: {rng.choice(WORDS)}\n---\n\n{body}\n")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, count)
+        manager = PostManager(root)
+        posts = manager.get_posts()
+
+        start = time.perf_counter()
+        manager.build_search_index(posts)
+        print(f"build index over {count} posts: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        for query in ('python', 'ser', 'python cache', '"thread pool"', 'deploy static bl'):
+            start = time.perf_counter()
+            for _ in range(10):
+                hits = manager.search(query)
+            elapsed = (time.perf_counter() - start) * 100
+            print(f"  {query!r:<22} {elapsed:7.2f} ms  ({len(hits)} results)")
+
+        start = time.perf_counter()
+        manager.save_post(posts[0].filename, manager.load_post(posts[0].filename) + "\nzebra\n")
+        print(f"save_post + reindex one post: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
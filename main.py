@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from ui.main_window import MainWindow
 
@@ -14,4 +15,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Post previews render in spawned worker processes
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+
+# Total characters of diff text kept; one huge generated file should not
+# push everything else out, so single entries above half are skipped
+MAX_CHARS = 128 * 1024 * 1024
+# Bytes of old file revisions kept for the history panel
+MAX_BLOB_BYTES = 32 * 1024 * 1024
+
+
+# LRU of diff texts. Keys carry the blob ids / worktree stat the diff was
+# made from (see GitManager._diff_key), so edits and staging naturally miss;
+# prune() drops paths that left the status list.
+class DiffCache:
+    def __init__(self, max_chars=MAX_CHARS):
+        self.max_chars = max_chars
+        self.entries = OrderedDict()
+        self.chars = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            text = self.entries.get(key)
+            if text is not None:
+                self.entries.move_to_end(key)
+            return text
+
+    def put(self, key, text):
+        if len(text) > self.max_chars // 2:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.chars -= len(old)
+            self.entries[key] = text
+            self.chars += len(text)
+            while self.chars > self.max_chars:
+                _, dropped = self.entries.popitem(last=False)
+                self.chars -= len(dropped)
+
+    def prune(self, paths):
+        # Keep only entries whose path (key[0]) is still in paths
+        with self.lock:
+            for key in [k for k in self.entries if k[0] not in paths]:
+                self.chars -= len(self.entries.pop(key))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.chars = 0
+
+
+# Same LRU for blob contents keyed by (commit sha, path). Those never change,
+# so nothing needs pruning; size is the only bound.
+class BlobCache(DiffCache):
+    def __init__(self, max_bytes=MAX_BLOB_BYTES):
+        super().__init__(max_bytes)
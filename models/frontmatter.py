@@ -0,0 +1,133 @@
+import datetime
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+import yaml
+
+try:
+    # libyaml-backed loader is several times faster when PyYAML was built with it
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+CACHE_SIZE = 8192
+
+# "key: value" with a plain scalar value: no quoting, flow collections,
+# block scalars, anchors, tags or comments. Anything else goes to YAML.
+SIMPLE_LINE_RE = re.compile(r'^([A-Za-z_][\w-]*)[ \t]*:(?:[ \t]+([^\'"\[\]{}|>&*!#%@`][^#]*?))?[ \t]*$')
+
+DATE_FORMATS = (
+    '%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y', '%d.%m.%Y',
+    '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y', '%B %Y', '%b %Y',
+)
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def parse_block(block):
+    # Frontmatter text (between the '---' fences) -> dict. Memoized on the
+    # block's hash, so headers that did not change are never parsed twice.
+    key = hashlib.sha1(block.encode('utf-8')).digest()
+    with _lock:
+        meta = _cache.get(key)
+        if meta is not None:
+            _cache.move_to_end(key)
+            return dict(meta)
+
+    meta = _parse_simple(block)
+    if meta is None:
+        meta = _parse_yaml(block)
+
+    with _lock:
+        _cache[key] = meta
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return dict(meta)
+
+
+def _parse_simple(block):
+    # Fast path for the common flat header; None means "needs real YAML"
+    meta = {}
+    for line in block.split('\n'):
+        line = line.rstrip('\r')
+        if not line.strip():
+            continue
+        m = SIMPLE_LINE_RE.match(line)
+        if not m:
+            return None
+        meta[m.group(1)] = m.group(2) or ''
+    return meta
+
+
+def _parse_yaml(block):
+    try:
+        data = yaml.load(block, Loader=YamlLoader)
+    except yaml.YAMLError as e:
+        print(f"Invalid frontmatter, falling back to key: value lines: {e}")
+        return _parse_lines(block)
+    if not isinstance(data, dict):
+        return {}
+    return {str(k): ('' if v is None else v) for k, v in data.items()}
+
+
+def _parse_lines(block):
+    # The original line splitter; only used for headers YAML rejects
+    meta = {}
+    for line in block.split('\n'):
+        if ':' in line:
+            key, val = line.split(':', 1)
+            meta[key.strip()] = val.strip()
+    return meta
+
+
+def parse_date(value):
+    # datetime.date for a frontmatter date value, or None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = as_text(value).strip()
+    if not text:
+        return None
+    try:
+        return datetime.date.fromisoformat(text[:10])
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def date_key(value):
+    # Sortable string: ISO date when parseable, '' (sorts oldest) otherwise
+    date = parse_date(value)
+    return date.isoformat() if date else ''
+
+
+def as_text(value):
+    # Display form of a frontmatter value (lists become comma separated)
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ', '.join(as_text(v) for v in value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+def split_document(content):
+    # (frontmatter dict, markdown body) of a whole post
+    if content.startswith('---'):
+        end = content.find('\n---', 3)
+        if end != -1:
+            body_start = content.find('\n', end + 4)
+            body = content[body_start + 1:] if body_start != -1 else ''
+            return parse_block(content[3:end]), body
+    return {}, content
@@ -0,0 +1,113 @@
+import os
+import subprocess
+import threading
+
+# Specs written before reading their answers back. Keeps the pipes from
+# filling up in both directions (which would deadlock) on huge batches.
+CHUNK = 64
+
+
+# Long-lived `git cat-file --batch` / `--batch-check` pipes. Every object
+# read after the first costs a pipe round trip instead of a process spawn,
+# and several specs ("HEAD:path", ":path", a sha) go out per round trip.
+class GitCatFile:
+    def __init__(self, git_exec, repo_path):
+        self.git_exec = git_exec
+        self.repo_path = repo_path
+        self.lock = threading.Lock()
+        self.procs = {}
+        self.index_stamps = {}
+        self.spawned = 0
+        self.index_path = os.path.join(repo_path, '.git', 'index')
+
+    def read(self, specs):
+        # [(type, bytes) or None] per spec, in order
+        return self._query('--batch', specs, with_content=True)
+
+    def info(self, specs):
+        # [(sha, type, size) or None] per spec, in order
+        return self._query('--batch-check', specs, with_content=False)
+
+    def close(self):
+        with self.lock:
+            for proc in self.procs.values():
+                self._stop(proc)
+            self.procs.clear()
+
+    def _query(self, mode, specs, with_content):
+        results = [None] * len(specs)
+        # Object names are newline-terminated on the wire
+        wanted = [(i, s) for i, s in enumerate(specs) if '\n' not in s]
+        with self.lock:
+            # cat-file loads the index once, so ":path" answers go stale after
+            # a stage/commit; restart when the index file has changed since
+            if any(s.startswith(':') for _, s in wanted) and \
+                    self.index_stamps.get(mode) != self._index_stamp():
+                self._stop(self.procs.pop(mode, None))
+            for start in range(0, len(wanted), CHUNK):
+                chunk = wanted[start:start + CHUNK]
+                try:
+                    answers = self._round_trip(mode, [s for _, s in chunk], with_content)
+                except (OSError, ValueError) as e:
+                    # Broken pipe or a dead process: drop it, retry once on a fresh one
+                    print(f"git cat-file {mode} restarted: {e}")
+                    self._stop(self.procs.pop(mode, None))
+                    answers = self._round_trip(mode, [s for _, s in chunk], with_content)
+                for (i, _), answer in zip(chunk, answers):
+                    results[i] = answer
+        return results
+
+    def _round_trip(self, mode, specs, with_content):
+        proc = self._proc(mode)
+        proc.stdin.write(''.join(s + '\n' for s in specs).encode('utf-8'))
+        proc.stdin.flush()
+
+        answers = []
+        for _ in specs:
+            header = proc.stdout.readline()
+            if not header:
+                raise ValueError("unexpected end of output")
+            # "<name> missing" / "<name> ambiguous"; names may contain spaces
+            if header.endswith((b' missing\n', b' ambiguous\n')):
+                answers.append(None)
+                continue
+            sha, obj_type, size = header.split()
+            size = int(size)
+            if not with_content:
+                answers.append((sha.decode(), obj_type.decode(), size))
+                continue
+            data = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline
+            answers.append((obj_type.decode(), data))
+        return answers
+
+    def _proc(self, mode):
+        proc = self.procs.get(mode)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                [self.git_exec, 'cat-file', mode],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            self.procs[mode] = proc
+            self.index_stamps[mode] = self._index_stamp()
+            self.spawned += 1
+        return proc
+
+    def _index_stamp(self):
+        try:
+            st = os.stat(self.index_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _stop(self, proc):
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
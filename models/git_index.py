@@ -0,0 +1,341 @@
+# In-process reader for .git/index (versions 2-4) and a cheap dirty check
+# that compares its cached stat data against the working tree
+import os
+import stat
+import struct
+import time
+
+HEADER = struct.Struct('>4sII')
+# ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size
+ENTRY_STAT = struct.Struct('>10I')
+FLAG_ASSUME_VALID = 0x8000
+FLAG_EXTENDED = 0x4000
+FLAG_STAGE_MASK = 0x3000
+# Extended flags (v3+): skip-worktree and intent-to-add entries don't
+# describe the file on disk
+EXT_SKIP_WORKTREE = 0x4000
+EXT_INTENT_TO_ADD = 0x2000
+# Directory listings are cached once their mtime is this old (coarse
+# filesystem timestamps)
+LISTING_SETTLE_NS = 2_000_000_000
+
+
+class IndexFormatError(Exception):
+    pass
+
+
+class IndexEntry:
+    __slots__ = ('path', 'mtime_ns', 'ctime_ns', 'ino', 'mode', 'size', 'sha', 'flags', 'ext_flags')
+
+    def __init__(self, path, mtime_ns, ctime_ns, ino, mode, size, sha, flags, ext_flags=0):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.ctime_ns = ctime_ns
+        self.ino = ino
+        self.mode = mode
+        self.size = size
+        self.sha = sha
+        self.flags = flags
+        self.ext_flags = ext_flags
+
+    @property
+    def stage(self):
+        return (self.flags & FLAG_STAGE_MASK) >> 12
+
+
+def _varint(data, pos):
+    # git's offset encoding (varint.c), used by v4 path compression
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, pos
+
+
+def read_index(path, hash_size=20):
+    # -> (version, [IndexEntry]); extensions are ignored
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise IndexFormatError("index too short")
+    signature, version, count = HEADER.unpack_from(data, 0)
+    if signature != b'DIRC' or version not in (2, 3, 4):
+        raise IndexFormatError(f"unsupported index (version {version})")
+
+    entries = []
+    pos = HEADER.size
+    prev_path = b''
+    for _ in range(count):
+        start = pos
+        (ctime_s, ctime_ns, mtime_s, mtime_ns, _dev, ino, mode, _uid, _gid,
+         size) = ENTRY_STAT.unpack_from(data, pos)
+        pos += ENTRY_STAT.size
+        sha = data[pos:pos + hash_size]
+        pos += hash_size
+        flags = (data[pos] << 8) | data[pos + 1]
+        pos += 2
+        ext_flags = 0
+        if flags & FLAG_EXTENDED:
+            if version < 3:
+                raise IndexFormatError("extended flags in a v2 index")
+            ext_flags = (data[pos] << 8) | data[pos + 1]
+            pos += 2
+
+        if version == 4:
+            strip, pos = _varint(data, pos)
+            end = data.index(b'\0', pos)
+            name = prev_path[:len(prev_path) - strip] + data[pos:end]
+            pos = end + 1
+            prev_path = name
+        else:
+            end = data.index(b'\0', pos)
+            name = data[pos:end]
+            # Entries are NUL-padded to a multiple of 8 bytes
+            entry_len = (end - start) + 1
+            pos = start + ((entry_len + 7) & ~7)
+        if pos > len(data):
+            raise IndexFormatError("truncated index entry")
+
+        entries.append(IndexEntry(
+            os.fsdecode(name),
+            mtime_s * 1_000_000_000 + mtime_ns,
+            ctime_s * 1_000_000_000 + ctime_ns,
+            ino, mode, size, sha, flags, ext_flags,
+        ))
+    return version, entries
+
+
+# Tracked paths the CMS edits; directories end with a slash
+DEFAULT_SCOPE = ('content/', 'data.json')
+
+
+def in_scope(path, scope=DEFAULT_SCOPE):
+    return any(path.startswith(p) if p.endswith('/') else path == p for p in scope)
+
+
+def find_git_dir(repo_path):
+    # .git is a directory, or a "gitdir: ..." file for worktrees/submodules
+    dot_git = os.path.join(repo_path, '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, 'r', encoding='utf-8') as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if not line.startswith('gitdir:'):
+        return None
+    return os.path.normpath(os.path.join(repo_path, line[7:].strip()))
+
+
+def _stat_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class DirtyChecker:
+    """Answers "is anything under scope uncommitted?" from .git/index alone.
+
+    check() returns (state, candidates): state is True/False when the index
+    and the stat data settle it, or None when only git can tell (changed
+    mtime with the same size, racily clean entries, untracked files git
+    hasn't classified yet, conflicts, or staged changes since the last
+    confirmed-clean status). Untracked files git has reported stay dirty
+    without asking again while they and the ignore files are unchanged.
+    """
+
+    def __init__(self, repo_path, scope=DEFAULT_SCOPE):
+        self.repo_path = repo_path
+        self.scope = scope
+        self.git_dir = find_git_dir(repo_path)
+        self.index_path = os.path.join(self.git_dir, 'index') if self.git_dir else None
+        self._index_sig = None
+        self._entries = []
+        self._tracked = set()
+        self._hash_size = None
+        # Index + HEAD signature at the last time git said nothing in scope
+        # was staged; while it holds, the index still matches HEAD
+        self._clean_sig = None
+        # Untracked files git didn't report, i.e. ignored ones, and those it
+        # did report -> their stat then; both pruned to the latest scan and
+        # dropped when an ignore file changes
+        self._ignored = set()
+        self._reported = {}
+        self._rules_sig = None
+        self._last_untracked = {}
+        # Directory listings by mtime: rel dir -> (mtime_ns, [(name, is_dir)])
+        self._listings = {}
+
+    def check(self):
+        if not self.index_path:
+            return None, []
+        sig = _stat_sig(self.index_path)
+        if sig is None:
+            return None, []
+        if sig != self._index_sig:
+            try:
+                self._load(sig)
+            except (OSError, IndexFormatError, ValueError, IndexError, struct.error):
+                self._index_sig = None
+                return None, []
+
+        dirty = []
+        unsure = []
+        index_mtime = sig[0]
+        for entry in self._entries:
+            if entry.stage or entry.ext_flags & (EXT_SKIP_WORKTREE | EXT_INTENT_TO_ADD):
+                unsure.append(entry.path)
+                continue
+            if entry.flags & FLAG_ASSUME_VALID:
+                continue
+            try:
+                st = os.lstat(os.path.join(self.repo_path, entry.path))
+            except FileNotFoundError:
+                dirty.append(entry.path)
+                continue
+            except OSError:
+                unsure.append(entry.path)
+                continue
+            if (st.st_size & 0xffffffff) != entry.size:
+                dirty.append(entry.path)
+            elif stat.S_ISREG(st.st_mode) and (st.st_mode & 0o100) != (entry.mode & 0o100):
+                dirty.append(entry.path)
+            elif not self._same_mtime(entry, st) or entry.mtime_ns >= index_mtime:
+                # Touched, or written in the same tick as the index
+                # ("racily clean"): git would have to re-hash it
+                unsure.append(entry.path)
+
+        untracked, rules_sig = self._untracked()
+        if rules_sig != self._rules_sig:
+            self._ignored.clear()
+            self._reported.clear()
+            self._rules_sig = rules_sig
+        self._ignored &= untracked.keys()
+        self._reported = {p: sig for p, sig in self._reported.items() if p in untracked}
+        self._last_untracked = {}
+        for path, sig in untracked.items():
+            if path in self._ignored:
+                continue
+            if self._reported.get(path) == sig:
+                dirty.append(path)
+            else:
+                self._last_untracked[path] = sig
+                unsure.append(path)
+
+        candidates = dirty + unsure
+        if dirty:
+            return True, candidates
+        if unsure or self._clean_sig != self._baseline_sig():
+            return None, candidates
+        return False, []
+
+    def confirm(self, reported, staged_in_scope):
+        # Feed back a real git status: `reported` are the paths it listed,
+        # staged_in_scope whether any of them were staged
+        dirs = tuple(p for p in reported if p.endswith('/'))
+        for path, sig in self._last_untracked.items():
+            if path in reported or path.startswith(dirs):
+                self._reported[path] = sig
+            else:
+                self._ignored.add(path)
+        if not staged_in_scope:
+            self._clean_sig = self._baseline_sig()
+
+    @staticmethod
+    def _same_mtime(entry, st):
+        # Indexes written without nanosecond support store 0 there
+        if entry.mtime_ns % 1_000_000_000 == 0:
+            return st.st_mtime_ns // 1_000_000_000 == entry.mtime_ns // 1_000_000_000
+        return st.st_mtime_ns == entry.mtime_ns
+
+    def _load(self, sig):
+        if self._hash_size is None:
+            self._hash_size = self._object_hash_size()
+        _version, entries = read_index(self.index_path, self._hash_size)
+        self._entries = [e for e in entries if in_scope(e.path, self.scope)]
+        self._tracked = {e.path for e in self._entries}
+        self._index_sig = sig
+
+    def _object_hash_size(self):
+        try:
+            with open(os.path.join(self.git_dir, 'config'), 'r', encoding='utf-8') as f:
+                config = f.read().lower()
+        except OSError:
+            return 20
+        return 32 if 'objectformat = sha256' in config else 20
+
+    def _untracked(self):
+        # ({untracked path in scope: stat sig}, signature of the ignore
+        # files that decide which of them git reports). Directories are
+        # only re-listed when their mtime moves.
+        found = {}
+        rules = [_stat_sig(os.path.join(self.repo_path, '.gitignore')),
+                 _stat_sig(os.path.join(self.git_dir, 'info', 'exclude'))]
+        seen = set()
+        for prefix in self.scope:
+            if not prefix.endswith('/'):
+                if prefix not in self._tracked:
+                    sig = _stat_sig(os.path.join(self.repo_path, prefix))
+                    if sig is not None:
+                        found[prefix] = sig
+                continue
+            stack = [prefix.rstrip('/')]
+            while stack:
+                rel = stack.pop()
+                names = self._listing(rel)
+                if names is None:
+                    continue
+                seen.add(rel)
+                for name, is_dir in names:
+                    path = f"{rel}/{name}"
+                    if is_dir:
+                        stack.append(path)
+                        continue
+                    if name == '.gitignore':
+                        rules.append((path, _stat_sig(os.path.join(self.repo_path, path))))
+                    if path not in self._tracked:
+                        sig = _stat_sig(os.path.join(self.repo_path, path))
+                        if sig is not None:
+                            found[path] = sig
+        for rel in [rel for rel in self._listings if rel not in seen]:
+            del self._listings[rel]
+        return found, tuple(rules[:2]) + tuple(sorted(rules[2:]))
+
+    def _listing(self, rel):
+        path = os.path.join(self.repo_path, rel)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._listings.get(rel)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with os.scandir(path) as it:
+                names = [(e.name, e.is_dir(follow_symlinks=False)) for e in it]
+        except OSError:
+            return None
+        # A listing taken in the same tick as the last change could miss a
+        # file added right after without moving the mtime: don't keep it
+        if time.time_ns() - mtime > LISTING_SETTLE_NS:
+            self._listings[rel] = (mtime, names)
+        return names
+
+    def _baseline_sig(self):
+        head = os.path.join(self.git_dir, 'HEAD')
+        try:
+            with open(head, 'r', encoding='utf-8') as f:
+                ref = f.read().strip()
+        except OSError:
+            return None
+        ref_sig = None
+        if ref.startswith('ref:'):
+            ref_sig = _stat_sig(os.path.join(self.git_dir, ref[4:].strip()))
+        return (_stat_sig(self.index_path), ref, ref_sig,
+                _stat_sig(os.path.join(self.git_dir, 'packed-refs')))
@@ -0,0 +1,96 @@
+import subprocess
+import threading
+from datetime import datetime
+
+# Unit/record separators can't appear in the fields we ask for
+FIELD_SEP = b'\x1f'
+RECORD_SEP = b'\x1e'
+LOG_FORMAT = '--format=%H%x1f%h%x1f%an%x1f%at%x1f%s%x1e'
+READ_CHUNK = 64 * 1024
+
+
+class LogEntry:
+    __slots__ = ('sha', 'short', 'author', 'timestamp', 'subject')
+
+    def __init__(self, sha, short, author, timestamp, subject):
+        self.sha = sha
+        self.short = short
+        self.author = author
+        self.timestamp = timestamp
+        self.subject = subject
+
+    @property
+    def date(self):
+        return datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M')
+
+    def label(self):
+        return f"{self.short}  {self.date}  {self.author}  {self.subject}"
+
+
+def parse_record(record):
+    fields = record.strip(b'\n').split(FIELD_SEP)
+    if len(fields) != 5:
+        return None
+    sha, short, author, timestamp, subject = (f.decode('utf-8', 'replace') for f in fields)
+    try:
+        timestamp = int(timestamp)
+    except ValueError:
+        timestamp = 0
+    return LogEntry(sha, short, author, timestamp, subject)
+
+
+# One `git log` process per view, read a page at a time. git blocks once the
+# pipe is full, so it only walks as much history as has been asked for, and
+# there is no --skip re-walk per page.
+class GitLogStream:
+    def __init__(self, git_exec, repo_path, path=None, rev='HEAD'):
+        self.git_exec = git_exec
+        self.repo_path = repo_path
+        self.path = path
+        self.rev = rev
+        self.done = False
+        self.lock = threading.Lock()
+        self._proc = None
+        self._buf = b''
+
+    def read(self, count):
+        # Next `count` entries (fewer at the end of history)
+        with self.lock:
+            if self.done:
+                return []
+            if self._proc is None:
+                self._proc = self._start()
+            proc = self._proc
+            while self._buf.count(RECORD_SEP) < count:
+                # close() from another thread kills git, which ends this read
+                chunk = proc.stdout.read1(READ_CHUNK)
+                if not chunk:
+                    self._finish(proc)
+                    break
+                self._buf += chunk
+            *records, self._buf = self._buf.split(RECORD_SEP)
+            if len(records) > count:
+                self._buf = RECORD_SEP.join(records[count:] + [self._buf])
+                records = records[:count]
+        entries = (parse_record(r) for r in records)
+        return [e for e in entries if e]
+
+    def close(self):
+        self.done = True
+        proc, self._proc = self._proc, None
+        if proc and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    def _start(self):
+        args = [self.git_exec, 'log', LOG_FORMAT, self.rev]
+        if self.path:
+            args += ['--', self.path]
+        return subprocess.Popen(args, cwd=self.repo_path, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+
+    def _finish(self, proc):
+        self.done = True
+        self._proc = None
+        proc.stdout.close()
+        proc.wait()
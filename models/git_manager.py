@@ -1,10 +1,34 @@
 import subprocess
+import difflib
 import os
 import sys
+from models.git_batch import GitCatFile
+from models.diff_cache import DiffCache, BlobCache
+from models.git_log import GitLogStream
+from models.git_index import DirtyChecker, in_scope, find_git_dir
+from models.git_status import parse_porcelain_v2
+
+# Above this many bytes (old + new) difflib gets slow; let `git diff` do it
+DIFFLIB_MAX_BYTES = 1024 * 1024
+# Path lists longer than this go through --pathspec-from-file on stdin
+# instead of the command line (Windows caps it around 32K characters)
+MAX_ARGV_CHARS = 8000
 
 class GitManager:
+    # `git --version` result per executable, checked once per process
+    _version_cache = {}
+
     def __init__(self, repo_path):
         self.repo_path = repo_path
+        self.spawn_count = 0
+        self._cat_file = None
+        self._dirty_checker = None
+        self._filter_config = (None, {})   # (.git/config stat, {key: value})
+        self.diff_cache = DiffCache()
+        self.blob_cache = BlobCache()
+        # Status speedups; fsmonitor needs git's builtin daemon (macOS/Windows)
+        self.untracked_cache = True
+        self.fsmonitor = False
         # Try to find git executable
         self.git_exec = "git"
         if sys.platform == "win32":
@@ -19,14 +43,54 @@ class GitManager:
                     self.git_exec = p
                     break
 
-    def get_git_version(self):
+    def get_git_version(self, refresh=False):
+        cached = GitManager._version_cache.get(self.git_exec)
+        if cached and not refresh:
+            return cached
         try:
+            self.spawn_count += 1
             res = subprocess.run([self.git_exec, '--version'], capture_output=True, text=True)
-            return True, res.stdout.strip()
+            result = (True, res.stdout.strip())
         except FileNotFoundError:
-            return False, "Git executable not found in PATH."
+            result = (False, "Git executable not found in PATH.")
         except Exception as e:
             return False, str(e)
+        GitManager._version_cache[self.git_exec] = result
+        return result
+
+    @property
+    def cat_file(self):
+        if self._cat_file is None:
+            self._cat_file = GitCatFile(self.git_exec, self.repo_path)
+        return self._cat_file
+
+    def close(self):
+        if self._cat_file:
+            self._cat_file.close()
+            self._cat_file = None
+
+    def read_blobs(self, specs):
+        # Contents for object specs like "HEAD:path", ":path" (index) or a
+        # sha, in one round trip over the persistent cat-file pipe
+        valid, _ = self._check_repo()
+        if not valid:
+            return [None] * len(specs)
+        try:
+            return [r[1] if r and r[0] == 'blob' else None for r in self.cat_file.read(specs)]
+        except (OSError, ValueError) as e:
+            print(f"git cat-file failed: {e}")
+            return [None] * len(specs)
+
+    def object_info(self, specs):
+        # (sha, type, size) or None per spec, via the --batch-check pipe
+        valid, _ = self._check_repo()
+        if not valid:
+            return [None] * len(specs)
+        try:
+            return self.cat_file.info(specs)
+        except (OSError, ValueError) as e:
+            print(f"git cat-file failed: {e}")
+            return [None] * len(specs)
 
     def _check_repo(self):
         if not self.repo_path or not os.path.exists(self.repo_path):
@@ -35,12 +99,13 @@ class GitManager:
             return False, f"Directory is not a git repository (no .git folder): {self.repo_path}"
         return True, ""
 
-    def run_git(self, args):
+    def run_git(self, args, input=None, strip=True):
         valid, msg = self._check_repo()
         if not valid:
             return "", msg
 
         try:
+            self.spawn_count += 1
             # Important: set shell=False for security, but ensure executable is found
             # On Linux, shell=False is standard.
             result = subprocess.run(
@@ -48,56 +113,258 @@ class GitManager:
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
+                input=input,
                 check=False
             )
+            stdout = result.stdout.strip() if strip else result.stdout
             if result.returncode != 0:
-                return result.stdout.strip(), result.stderr.strip()
-            return result.stdout.strip(), ""
+                return stdout, result.stderr.strip()
+            return stdout, ""
         except Exception as e:
             return "", str(e)
 
-    def get_status(self):
-        # Check binary first
+    def get_status(self, optional_locks=True):
+        # (staged, unstaged, err) with StatusItem records sorted by path.
+        # optional_locks=False for background refreshes: git then won't
+        # take index.lock to write back refreshed stat data, so it can't make
+        # the user's own `git add`/`commit` fail with "index.lock exists".
+        # Check binary first (cached after the first call)
         ok, ver = self.get_git_version()
         if not ok:
             return [], [], ver
 
-        stdout, err = self.run_git(['status', '-z', '--porcelain'])
+        args = ['status', '--porcelain=v2', '-z']
+        opts = [] if optional_locks else ['--no-optional-locks']
+        if self.untracked_cache:
+            # Lets git skip re-scanning directories whose mtime didn't change
+            opts += ['-c', 'core.untrackedCache=true']
+        if self.fsmonitor:
+            opts += ['-c', 'core.fsmonitor=true']
+        stdout, err = self.run_git(opts + args, strip=False)
         if err:
             return [], [], err
-        
-        staged = []
-        unstaged = []
-        
-        if not stdout:
-            return staged, unstaged, ""
-
-        entries = stdout.split('\x00')
-        for entry in entries:
-            if not entry or len(entry) < 3: continue
-            code = entry[:2]
-            path = entry[3:]
-            
-            x_code = code[0]
-            y_code = code[1]
-            
-            if x_code in 'MADRC': 
-                staged.append({'path': path, 'status': x_code})
-            if y_code in 'MD?':   
-                unstaged.append({'path': path, 'status': y_code})
-                
+        staged, unstaged = parse_porcelain_v2(stdout)
         return staged, unstaged, ""
 
+    def log_stream(self, path=None):
+        # History newest first, read lazily; path limits it to one file
+        return GitLogStream(self.git_exec, self.repo_path, path)
+
+    def read_revision(self, sha, path):
+        # File contents at a commit; repeat reads come from the LRU
+        key = (sha, path)
+        data = self.blob_cache.get(key)
+        if data is None:
+            data = self.read_blobs([f"{sha}:{path}"])[0]
+            if data is None:
+                return None
+            self.blob_cache.put(key, data)
+        return data.decode('utf-8', errors='replace')
+
+    def get_commit(self, sha):
+        # Message, stat and patch of one commit
+        stdout, err = self.run_git(['show', '--stat', '--patch', '--format=fuller', sha])
+        return err or stdout
+
+    @property
+    def dirty_checker(self):
+        if self._dirty_checker is None:
+            self._dirty_checker = DirtyChecker(self.repo_path)
+        return self._dirty_checker
+
+    def check_dirty(self):
+        # (dirty, paths) for content/ and data.json. Answered from
+        # .git/index and os.stat when possible; git status only runs when
+        # that can't decide. dirty is None if git itself failed.
+        checker = self.dirty_checker
+        state, candidates = checker.check()
+        if state is not None:
+            return state, candidates
+        # Polled every few seconds: never contend for index.lock
+        staged, unstaged, err = self.get_status(optional_locks=False)
+        if err:
+            return None, candidates
+        staged = [item for item in staged if in_scope(item.path)]
+        unstaged = [item for item in unstaged if in_scope(item.path)]
+        paths = sorted({item.path for item in staged + unstaged})
+        checker.confirm(set(paths), bool(staged))
+        return bool(paths), paths
+
     # ... rest of methods use run_git, so they are fixed by proxy ...
     def get_diff(self, filepath=None, staged=False):
+        key = size = None
+        if filepath:
+            key, size = self._diff_key(filepath, staged)
+            cached = self.diff_cache.get(key) if key else None
+            if cached is not None:
+                return cached
+            if size <= DIFFLIB_MAX_BYTES:
+                diff = self._diff_from_blobs(filepath, staged)
+                if diff is not None:
+                    self.diff_cache.put(key, diff)
+                    return diff
         args = ['diff']
         if staged: args.append('--cached')
         if filepath: args.append(filepath)
         stdout, err = self.run_git(args)
-        return stdout if not err else err
+        if err:
+            return err
+        if key:
+            self.diff_cache.put(key, stdout)
+        return stdout
+
+    def _diff_key(self, filepath, staged):
+        # (cache key, combined size of both sides). The key names exactly
+        # what the diff compares: index blob vs HEAD blob, or index blob vs
+        # the worktree file's stat. Key is None if the inputs can't be read.
+        specs = [':' + filepath] + (['HEAD:' + filepath] if staged else [])
+        info = self.object_info(specs)
+        index_sha = info[0][0] if info[0] else None
+        size = info[0][2] if info[0] else 0
+        if staged:
+            other = info[1][0] if info[1] else None
+            size += info[1][2] if info[1] else 0
+        else:
+            try:
+                st = os.stat(os.path.join(self.repo_path, filepath))
+                other = (st.st_mtime_ns, st.st_size)
+                size += st.st_size
+            except FileNotFoundError:
+                other = None
+            except OSError:
+                return None, size
+        return (filepath, staged, index_sha, other), size
+
+    def _diff_from_blobs(self, filepath, staged):
+        # Single-file diff built from cat-file reads instead of a `git diff`
+        # process. Returns None when git has to do it: attributes or eol
+        # config may transform the content, or the objects can't be read.
+        if self._filters_may_apply(filepath, worktree=not staged):
+            return None
+        if staged:
+            old, new = self.read_blobs(['HEAD:' + filepath, ':' + filepath])
+        else:
+            old, = self.read_blobs([':' + filepath])
+            try:
+                with open(os.path.join(self.repo_path, filepath), 'rb') as f:
+                    new = f.read()
+            except FileNotFoundError:
+                new = None
+            except OSError:
+                return None
+        if old is None and new is None:
+            return None
+        return _unified_diff(filepath, old, new)
+
+    def _filters_may_apply(self, filepath, worktree):
+        # True if git could filter, textconv or eol-convert this path, which
+        # only `git diff` reproduces: a .gitattributes in the repo root or
+        # any directory on the path, info/attributes, a global attributes
+        # file, or (for worktree content) core.autocrlf / core.eol
+        parts = filepath.split('/')[:-1]
+        dirs = [os.path.join(self.repo_path, *parts[:i]) for i in range(len(parts) + 1)]
+        if any(os.path.exists(os.path.join(d, '.gitattributes')) for d in dirs):
+            return True
+        git_dir = find_git_dir(self.repo_path)
+        if git_dir and os.path.exists(os.path.join(git_dir, 'info', 'attributes')):
+            return True
+        config = self._read_filter_config(git_dir)
+        xdg = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+        if config.get('core.attributesfile') or os.path.exists(os.path.join(xdg, 'git', 'attributes')):
+            return True
+        if worktree:
+            if config.get('core.autocrlf', 'false').lower() not in ('false', 'no', 'off', '0'):
+                return True
+            if config.get('core.eol'):
+                return True
+        return False
+
+    def _read_filter_config(self, git_dir):
+        # core.autocrlf/eol/attributesFile from every config level, re-read
+        # only when the repo's own config file changes
+        try:
+            st = os.stat(os.path.join(git_dir, 'config')) if git_dir else None
+            stamp = (st.st_mtime_ns, st.st_size) if st else None
+        except OSError:
+            stamp = None
+        cached_stamp, config = self._filter_config
+        if cached_stamp == stamp and cached_stamp is not None:
+            return config
+        stdout, _ = self.run_git(['config', '-z', '--get-regexp', r'^core\.(autocrlf|eol|attributesfile)$'],
+                                 strip=False)
+        config = {}
+        for record in stdout.split('\0'):
+            key, _, value = record.partition('\n')
+            if key:
+                config[key.lower()] = value
+        self._filter_config = (stamp, config)
+        return config
 
     def stage_file(self, filepath): return self.run_git(['add', filepath])
     def unstage_file(self, filepath): return self.run_git(['reset', 'HEAD', filepath])
-    def commit(self, message): return self.run_git(['commit', '-m', message])
+
+    # Bulk variants: one git process for the whole path set
+    def stage_files(self, paths): return self._run_with_paths(['add', '-A'], paths)
+    def unstage_files(self, paths): return self._run_with_paths(['restore', '--staged'], paths)
+    def stage_all(self): return self.run_git(['add', '-A'])
+    def unstage_all(self): return self.run_git(['restore', '--staged', ':/'])
+
+    def _run_with_paths(self, args, paths):
+        if not paths:
+            return "", ""
+        # Paths from status are literal names, not globs
+        args = ['--literal-pathspecs'] + args
+        if sum(len(p) + 1 for p in paths) <= MAX_ARGV_CHARS:
+            return self.run_git(args + ['--'] + list(paths))
+        return self.run_git(args + ['--pathspec-from-file=-', '--pathspec-file-nul'],
+                            input='\0'.join(paths))
+    def commit(self, message): return self.run_git(self.commit_args(message))
     def push(self): return self.run_git(['push'])
     def pull(self): return self.run_git(['pull', '--rebase'])
+
+    def current_branch(self):
+        # Branch name, or None on a detached HEAD
+        stdout, err = self.run_git(['symbolic-ref', '--quiet', '--short', 'HEAD'])
+        return stdout if stdout and not err else None
+
+    def upstream(self):
+        # "remote/branch" HEAD's branch tracks, or None without one
+        stdout, err = self.run_git(['rev-parse', '--abbrev-ref', '--symbolic-full-name', '@{upstream}'])
+        return stdout if stdout and not err else None
+
+    def ahead_count(self):
+        # Commits HEAD has that its upstream doesn't; None without an upstream
+        stdout, err = self.run_git(['rev-list', '--count', '@{upstream}..HEAD'])
+        if err:
+            return None
+        try:
+            return int(stdout)
+        except ValueError:
+            return None
+
+    # Argument lists for GitJobRunner, which runs them asynchronously.
+    # --progress forces progress output even though stderr is not a tty.
+    def commit_args(self, message): return ['commit', '-m', message]
+    def push_args(self): return ['push', '--progress']
+    def pull_args(self): return ['pull', '--rebase', '--progress']
+
+
+def _unified_diff(path, old, new):
+    # git-style patch text for two blob versions; None means absent
+    if old == new:
+        return ""
+    header = [f"diff --git a/{path} b/{path}"]
+    if old is None:
+        header.append("new file")
+    elif new is None:
+        header.append("deleted file")
+    if b'\0' in (old or b'')[:8000] or b'\0' in (new or b'')[:8000]:
+        return "\n".join(header + [f"Binary files a/{path} and b/{path} differ"])
+
+    old_lines = (old or b'').decode('utf-8', 'replace').splitlines()
+    new_lines = (new or b'').decode('utf-8', 'replace').splitlines()
+    body = difflib.unified_diff(old_lines, new_lines,
+                                '/dev/null' if old is None else f"a/{path}",
+                                '/dev/null' if new is None else f"b/{path}",
+                                lineterm='')
+    return "\n".join(header + list(body))
@@ -0,0 +1,79 @@
+# Typed `git status --porcelain=v2 -z` records and snapshot deltas
+
+
+class StatusItem:
+    # One row of the staged or unstaged list. status is a single letter
+    # (M, A, D, R, C, T, U, or ? for untracked); orig_path is set for renames
+    # and copies.
+    __slots__ = ('path', 'status', 'orig_path')
+
+    def __init__(self, path, status, orig_path=None):
+        self.path = path
+        self.status = status
+        self.orig_path = orig_path
+
+    def key(self):
+        return (self.path, self.status, self.orig_path)
+
+    def label(self):
+        if self.orig_path:
+            return f"{self.status} {self.orig_path} -> {self.path}"
+        return f"{self.status} {self.path}"
+
+    def __eq__(self, other):
+        return isinstance(other, StatusItem) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"StatusItem({self.label()!r})"
+
+
+def parse_porcelain_v2(data):
+    # -z output -> (staged, unstaged) lists of StatusItem, sorted by path
+    staged = []
+    unstaged = []
+    fields = data.split('\0')
+    i = 0
+    while i < len(fields):
+        entry = fields[i]
+        i += 1
+        if not entry or entry[0] == '#':
+            continue
+        kind = entry[0]
+        if kind == '?':
+            unstaged.append(StatusItem(entry[2:], '?'))
+        elif kind == '1':
+            parts = entry.split(' ', 8)
+            _add(staged, unstaged, parts[1], parts[8])
+        elif kind == '2':
+            # Renamed/copied: the source path is the next NUL-separated field
+            parts = entry.split(' ', 9)
+            orig = fields[i] if i < len(fields) else None
+            i += 1
+            _add(staged, unstaged, parts[1], parts[9], orig)
+        elif kind == 'u':
+            parts = entry.split(' ', 10)
+            unstaged.append(StatusItem(parts[10], 'U'))
+        # '!' (ignored) is only reported when asked for; skip it
+    staged.sort(key=lambda item: item.path)
+    unstaged.sort(key=lambda item: item.path)
+    return staged, unstaged
+
+
+def _add(staged, unstaged, xy, path, orig=None):
+    x, y = xy[0], xy[1]
+    if x != '.':
+        staged.append(StatusItem(path, x, orig if x in 'RC' else None))
+    if y != '.':
+        unstaged.append(StatusItem(path, y))
+
+
+def diff_items(old, new):
+    # (removed, added) between two lists of StatusItem
+    old_set = set(old)
+    new_set = set(new)
+    removed = [item for item in old if item not in new_set]
+    added = [item for item in new if item not in old_set]
+    return removed, added
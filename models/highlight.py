@@ -0,0 +1,72 @@
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+CSS_CLASS = 'codehilite'
+# Highlighted blocks kept around; lexing is the slow part of a render
+CACHE_SIZE = 1024
+
+# What fenced_code emits for ```lang blocks
+CODE_BLOCK_RE = re.compile(r'<pre><code class="language-([^"]+)">(.*?)</code></pre>', re.S)
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def style_css(style='default'):
+    # Once per Pygments style, not per render
+    return HtmlFormatter(style=style).get_style_defs(f'.{CSS_CLASS}')
+
+
+@lru_cache(maxsize=None)
+def _formatter():
+    # Building an HtmlFormatter computes its whole stylesheet; share one.
+    # format() keeps no per-call state, so threads can use it together.
+    return HtmlFormatter(cssclass=CSS_CLASS)
+
+
+@lru_cache(maxsize=64)
+def _lexer(lang):
+    try:
+        return get_lexer_by_name(lang)
+    except ClassNotFound:
+        return None
+
+
+def highlight_code(lang, code):
+    # Memoized on (language, code hash); None if the language is unknown
+    key = (lang, hashlib.sha1(code.encode('utf-8')).digest())
+    with _lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+
+    lexer = _lexer(lang)
+    if lexer is None:
+        return None
+    result = highlight(code, lexer, _formatter())
+    with _lock:
+        _cache[key] = result
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def highlight_html(rendered):
+    # Swap fenced code blocks in Markdown output for Pygments markup
+    if '<pre><code class="language-' not in rendered:
+        return rendered
+
+    def _replace(m):
+        highlighted = highlight_code(m.group(1), html.unescape(m.group(2)))
+        return highlighted if highlighted is not None else m.group(0)
+    return CODE_BLOCK_RE.sub(_replace, rendered)
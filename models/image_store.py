@@ -0,0 +1,166 @@
+# Content-addressed images under content/images. A file is stored once as
+# <hash>.<ext> whatever it was called and however often it is inserted. An
+# index in the CMS cache (not the repository: publishing stages content/)
+# records each one's digest, format, dimensions and byte size.
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+
+HASH_CHARS = 16
+READ_CHUNK = 1024 * 1024
+
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'gif': 'gif', 'webp': 'webp'}
+
+
+def _jpeg_size(data):
+    # Walk the segments to the first start-of-frame marker
+    pos = 2
+    while pos + 9 < len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def image_info(head):
+    # (format, width, height) from the first bytes of a file, or None. The
+    # header is enough for every format we take; no decoder needed. A file
+    # cut off before its dimensions is None too.
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+        if len(head) < 24:
+            return None
+        width, height = struct.unpack('>II', head[16:24])
+        return 'png', width, height
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        if len(head) < 10:
+            return None
+        width, height = struct.unpack('<HH', head[6:10])
+        return 'gif', width, height
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        chunk = head[12:16]
+        if len(head) < (25 if chunk == b'VP8L' else 30):
+            return None
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return 'webp', width & 0x3FFF, height & 0x3FFF
+        if chunk == b'VP8L':
+            bits = int.from_bytes(head[21:25], 'little')
+            return 'webp', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            width = int.from_bytes(head[24:27], 'little') + 1
+            height = int.from_bytes(head[27:30], 'little') + 1
+            return 'webp', width, height
+        return None
+    if head[:2] == b'\xff\xd8':
+        size = _jpeg_size(head)
+        return ('jpeg',) + size if size else None
+    return None
+
+
+def _read_head(path):
+    # JPEG frame headers can sit behind large EXIF blocks
+    with open(path, 'rb') as f:
+        head = f.read(64 * 1024)
+    if head[:2] == b'\xff\xd8' and _jpeg_size(head) is None:
+        with open(path, 'rb') as f:
+            head = f.read()
+    return head
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    def __init__(self, repo_path, index_path=None):
+        self.repo_path = repo_path
+        self.images_dir = os.path.join(repo_path, 'content', 'images')
+        # None keeps the index in memory only
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self._index = None
+
+    def add(self, path):
+        # Store the image at `path`; -> (name, is_new), is_new when it wasn't
+        # indexed before. Raises ValueError for files that aren't a supported
+        # image. A file already in content/images that isn't stored under
+        # its hash is indexed where it is: posts may link it by that name.
+        info = image_info(_read_head(path))
+        if info is None:
+            raise ValueError(f"{os.path.basename(path)} is not a PNG, JPEG, GIF or WebP image")
+        fmt, width, height = info
+        digest = file_digest(path)[:HASH_CHARS]
+        name = f"{digest}.{EXTENSIONS[fmt]}"
+        dest = os.path.join(self.images_dir, name)
+        with self.lock:
+            index = self._load()
+            if not os.path.exists(dest):
+                # The same bytes indexed under another name
+                for other, entry in index.items():
+                    if entry.get('digest') == digest and \
+                            os.path.exists(os.path.join(self.images_dir, other)):
+                        return other, False
+                if self.contains(path):
+                    name, dest = os.path.basename(path), path
+            is_new = name not in index
+            if not os.path.exists(dest):
+                os.makedirs(self.images_dir, exist_ok=True)
+                tmp = dest + '.tmp'
+                shutil.copyfile(path, tmp)
+                os.replace(tmp, dest)
+            entry = index.setdefault(name, {})
+            entry.update(format=fmt, width=width, height=height, bytes=os.path.getsize(dest), digest=digest)
+            entry.setdefault('source', os.path.basename(path))
+            self._save()
+        return name, is_new
+
+    def entry(self, name):
+        with self.lock:
+            entry = self._load().get(name)
+            return dict(entry) if entry else None
+
+    def link(self, name, from_dir):
+        # Relative link to a stored image from a directory in the repo
+        rel = os.path.relpath(os.path.join(self.images_dir, name), from_dir)
+        return rel.replace(os.sep, '/')
+
+    def contains(self, path):
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.images_dir)
+
+    def _load(self):
+        if self._index is None:
+            self._index = {}
+            if self.index_path:
+                try:
+                    with open(self.index_path, 'r', encoding='utf-8') as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._index
+
+    def _save(self):
+        if not self.index_path:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.index_path)
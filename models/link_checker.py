@@ -0,0 +1,341 @@
+# Finds broken links and image references in posts and data.json. Local
+# targets are resolved against an in-memory listing of the repo's
+# directories (one scandir per directory, re-read only when its mtime
+# changes), so a check costs a read per changed post and no per-link stat.
+# External URLs are only checked when a url_checker is supplied.
+import json
+import os
+import posixpath
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+DATA_SOURCE = 'data.json'
+# data.json keys (or key suffixes) whose string values are link targets;
+# absolute URLs are picked up under any key
+DATA_LINK_KEYS = ('link', 'url', 'href', 'src', 'image', 'avatar', 'icon', 'resume')
+# Threads reading posts; external checks get their own pool
+READ_WORKERS = 8
+URL_WORKERS = 16
+URL_TIMEOUT = 5.0
+
+OK = 'ok'
+MISSING = 'missing'
+CASE = 'case mismatch'
+BROKEN = 'broken'
+
+FENCE_RE = re.compile(r'^(```|~~~).*?^\1[^\n]*$', re.M | re.S)
+INLINE_CODE_RE = re.compile(r'`[^`\n]+`')
+# ![alt](target "title") / [text](target). As in CommonMark, a bare target
+# may contain balanced parentheses (two levels deep here) and backslash
+# escapes; an <angled target> may contain anything but <, > and newlines.
+INLINE_RE = re.compile(r'''(!?)\[(?:[^\]\\]|\\.)*\]\(\s*
+    (?: <([^<>\n]*)>
+      | ((?: [^()\s\\] | \\. | \( (?: [^()\s\\] | \\. | \( [^()\s]* \) )* \) )+) )
+    (?:\s+(?:"[^"]*"|'[^']*'|\([^)]*\)))?\s*\)''', re.X)
+ESCAPE_RE = re.compile(r'\\([!-/:-@\[-`{-~])')
+REF_DEF_RE = re.compile(r'^[ ]{0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s+["\'(].*)?$', re.M)
+HTML_ATTR_RE = re.compile(r'<(img|a|source|script|link)\b[^>]*?\b(src|href)\s*=\s*["\']([^"\']+)["\']', re.I)
+SKIP_SCHEMES = ('mailto:', 'tel:', 'data:', 'javascript:')
+
+
+class LinkRef:
+    __slots__ = ('source', 'line', 'target', 'image')
+
+    def __init__(self, source, line, target, image):
+        self.source = source    # post filename or 'data.json'
+        self.line = line        # line number in a post, JSON path in data.json
+        self.target = target
+        self.image = image
+
+
+class LinkIssue:
+    __slots__ = ('ref', 'status', 'detail')
+
+    def __init__(self, ref, status, detail=''):
+        self.ref = ref
+        self.status = status
+        self.detail = detail
+
+
+class CheckReport:
+    __slots__ = ('issues', 'sources', 'links', 'external', 'seconds')
+
+    def __init__(self):
+        self.issues = []
+        self.sources = 0
+        self.links = 0
+        self.external = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return (f"CheckReport(issues={len(self.issues)}, sources={self.sources}, "
+                f"links={self.links}, external={self.external}, seconds={self.seconds:.3f})")
+
+
+def _blank(match):
+    # Keep newlines so line numbers survive removing code
+    return re.sub(r'[^\n]', ' ', match.group(0))
+
+
+def extract_links(source, text):
+    # LinkRefs in a Markdown document; code blocks and spans are skipped
+    text = INLINE_CODE_RE.sub(_blank, FENCE_RE.sub(_blank, text))
+    found = []
+    for m in INLINE_RE.finditer(text):
+        target = m.group(2) if m.group(2) is not None else ESCAPE_RE.sub(r'\1', m.group(3))
+        found.append((m.start(), target, m.group(1) == '!'))
+    for m in REF_DEF_RE.finditer(text):
+        found.append((m.start(), m.group(1), False))
+    for m in HTML_ATTR_RE.finditer(text):
+        found.append((m.start(), m.group(3), m.group(1).lower() == 'img'))
+    found.sort()
+    refs = []
+    line, pos = 1, 0
+    for start, target, image in found:
+        line += text.count('\n', pos, start)
+        pos = start
+        refs.append(LinkRef(source, line, target, image))
+    return refs
+
+
+def extract_data_links(data, path=''):
+    # LinkRefs from string values of link-like keys anywhere in data.json
+    refs = []
+    if isinstance(data, dict):
+        for key, value in data.items():
+            where = f"{path}.{key}" if path else key
+            if isinstance(value, str) and value.strip() and \
+                    (key.lower().endswith(DATA_LINK_KEYS) or is_external(value.strip())):
+                image = key.lower().endswith(('image', 'avatar', 'icon', 'src'))
+                refs.append(LinkRef(DATA_SOURCE, where, value.strip(), image))
+            else:
+                refs.extend(extract_data_links(value, where))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            refs.extend(extract_data_links(value, f"{path}[{i}]"))
+    return refs
+
+
+def is_external(target):
+    return target.startswith('//') or bool(re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', target))
+
+
+class DirIndex:
+    """Cached directory listings under root.
+
+    A directory is scanned once; later lookups re-stat it at most once per
+    refresh() and rescan only if its mtime moved.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._dirs = {}         # abs dir -> (mtime_ns, {name: is_dir}, {lowercased names})
+        self._fresh = set()     # dirs validated since the last refresh()
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        with self.lock:
+            self._fresh.clear()
+
+    def listing(self, path):
+        return self._entry(path)[1]
+
+    def _entry(self, path):
+        # (mtime_ns, names, lowercased names); names is None if unreadable
+        with self.lock:
+            cached = self._dirs.get(path)
+            if cached and path in self._fresh:
+                return cached
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self._dirs.pop(path, None)
+                return None, None, None
+            if not cached or cached[0] != mtime:
+                try:
+                    with os.scandir(path) as it:
+                        names = {e.name: e.is_dir() for e in it}
+                except OSError:
+                    return None, None, None
+                cached = (mtime, names, {name.lower() for name in names})
+                self._dirs[path] = cached
+            self._fresh.add(path)
+            return cached
+
+    def lookup(self, rel):
+        # -> 'file', 'dir', CASE (exists with different letter case) or None.
+        # Case matters: the published site is served from a case-sensitive
+        # filesystem even when the editing machine's isn't.
+        current = self.root
+        parts = [p for p in rel.split('/') if p and p != '.']
+        kind = 'dir'
+        for part in parts:
+            _, names, lowered = self._entry(current)
+            if names is None:
+                return None
+            if part not in names:
+                return CASE if part.lower() in lowered else None
+            kind = 'dir' if names[part] else 'file'
+            current = os.path.join(current, part)
+        return kind
+
+
+class HttpChecker:
+    """Default external checker: HEAD, falling back to GET when refused."""
+
+    def __init__(self, timeout=URL_TIMEOUT):
+        self.timeout = timeout
+
+    def __call__(self, url):
+        # -> (ok, detail)
+        for method in ('HEAD', 'GET'):
+            request = urllib.request.Request(url, method=method,
+                                             headers={'User-Agent': 'site-cms-link-check'})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return True, str(response.status)
+            except urllib.error.HTTPError as e:
+                if method == 'HEAD' and e.code in (403, 405, 501):
+                    continue
+                return False, f"HTTP {e.code}"
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                return False, str(getattr(e, 'reason', e))
+        return False, "no response"
+
+
+class LinkChecker:
+    """Link check over a PostManager's posts and the repo's data.json.
+
+    url_checker(url) -> (ok, detail) enables external checks; None skips
+    them. Extracted links are kept per post by (mtime, size) between runs.
+    """
+
+    def __init__(self, post_manager, url_checker=None, workers=READ_WORKERS):
+        self.posts = post_manager
+        self.repo_path = post_manager.repo_path
+        self.url_checker = url_checker
+        self.workers = workers
+        self.dirs = DirIndex(self.repo_path)
+        self._links = {}    # filename -> (mtime_ns, size, [LinkRef])
+        self._lock = threading.Lock()
+
+    def check(self):
+        start = time.perf_counter()
+        report = CheckReport()
+        self.dirs.refresh()
+        # Runs on a worker: a read-only listing leaves the post index's
+        # delta to the Posts tab's watcher
+        posts = self.posts.list_posts()
+        with ThreadPoolExecutor(self.workers) as pool:
+            per_post = list(pool.map(self._post_links, posts))
+        alive = {post.filename for post in posts}
+        with self._lock:
+            for name in [n for n in self._links if n not in alive]:
+                del self._links[name]
+        refs = [ref for links in per_post for ref in links]
+        refs.extend(self._data_links())
+        report.sources = len(posts) + 1
+        report.links = len(refs)
+
+        external = {}
+        # Posts all live in content/posts, so a target resolves the same way
+        # wherever it appears; only data.json differs
+        resolved = {}
+        for ref in refs:
+            target = ref.target
+            if target.startswith('#') or target.lower().startswith(SKIP_SCHEMES):
+                continue
+            if is_external(target):
+                external.setdefault(target if not target.startswith('//') else 'https:' + target, []).append(ref)
+                continue
+            key = (ref.source == DATA_SOURCE, target)
+            if key not in resolved:
+                resolved[key] = self._resolve(ref)
+            status, detail = resolved[key]
+            if status != OK:
+                report.issues.append(LinkIssue(ref, status, detail))
+
+        report.external = len(external)
+        if self.url_checker and external:
+            urls = list(external)
+            with ThreadPoolExecutor(min(URL_WORKERS, len(urls))) as pool:
+                for url, (ok, detail) in zip(urls, pool.map(self._check_url, urls)):
+                    if not ok:
+                        report.issues.extend(LinkIssue(ref, BROKEN, detail) for ref in external[url])
+        report.issues.sort(key=lambda i: (i.ref.source, str(i.ref.line)))
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _check_url(self, url):
+        try:
+            return self.url_checker(url)
+        except Exception as e:
+            return False, str(e)
+
+    def _post_links(self, post):
+        with self._lock:
+            cached = self._links.get(post.filename)
+        if cached and cached[0] == post.mtime_ns and cached[1] == post.size:
+            return cached[2]
+        try:
+            with open(post.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            return []
+        links = extract_links(post.filename, text)
+        with self._lock:
+            self._links[post.filename] = (post.mtime_ns, post.size, links)
+        return links
+
+    def _data_links(self):
+        try:
+            with open(os.path.join(self.repo_path, DATA_SOURCE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return extract_data_links(data)
+
+    def _resolve(self, ref):
+        # (status, detail) for a local target. Posts resolve relative to
+        # content/posts, data.json relative to the site root; root-relative
+        # paths may live in the repo root or under content/ (as served).
+        path = unquote(urlsplit(ref.target).path)
+        if not path:
+            return OK, ''
+        if path.startswith('/'):
+            bases = ['', 'content']
+        elif ref.source == DATA_SOURCE:
+            bases = ['', 'content']
+        else:
+            bases = ['content/posts']
+        candidates = []
+        for base in bases:
+            rel = posixpath.normpath(posixpath.join(base, path.lstrip('/')))
+            if rel.startswith('..'):
+                return MISSING, "points outside the repository"
+            candidates.append(rel)
+            # Built pages link to each other as .html; their sources are .md
+            stem, ext = posixpath.splitext(rel)
+            if ext == '.html':
+                candidates.append(stem + '.md')
+                if rel.startswith('posts/'):
+                    candidates.append('content/' + stem + '.md')
+        case = None
+        for rel in candidates:
+            kind = self.dirs.lookup(rel)
+            if kind == 'file':
+                return OK, ''
+            if kind == 'dir':
+                index = self.dirs.listing(os.path.join(self.repo_path, rel)) or {}
+                if 'index.html' in index or 'index.md' in index:
+                    return OK, ''
+            if kind == CASE and case is None:
+                case = rel
+        if case:
+            return CASE, f"{case} differs only in letter case"
+        return MISSING, f"no {candidates[0]}"
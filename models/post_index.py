@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+from models.frontmatter import as_text, date_key
+from models.post_scanner import scan_posts, read_headers
+
+SCHEMA_VERSION = 3
+
+
+# Listing entry: metadata only, the body is loaded on demand via
+# PostManager.load_post so memory scales with post count, not corpus size.
+class PostRecord:
+    __slots__ = ('filename', 'path', 'title', 'date', 'sort_date', 'mtime_ns', 'size')
+
+    def __init__(self, filename, path, title, date, sort_date='', mtime_ns=0, size=0):
+        self.filename = filename
+        self.path = path
+        self.title = title
+        self.date = date            # as written in the frontmatter
+        self.sort_date = sort_date  # ISO date, '' if unparseable
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+    def __repr__(self):
+        return f"PostRecord({self.filename!r}, title={self.title!r}, date={self.date!r})"
+
+
+# Persistent cache of post metadata keyed by filename + mtime + size.
+# A refresh stats the posts directory once and only hands files whose stat
+# changed to the parser; rows for deleted files are dropped.
+class PostIndex:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or ':memory:'
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.lock = threading.Lock()
+        try:
+            self.conn = self._connect()
+        except sqlite3.DatabaseError as e:
+            # Corrupt cache file: it is only a cache, so start over
+            print(f"Post index unreadable, rebuilding: {e}")
+            os.remove(self.db_path)
+            self.conn = self._connect()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS posts')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                filename TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                date TEXT NOT NULL,
+                sort_date TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        return conn
+
+    def refresh(self, posts_dir, parse):
+        # parse(path) must return the frontmatter dict of a single post.
+        # Returns PostRecord objects for every post currently on disk.
+        with self.lock:
+            self._sync(posts_dir, parse)
+            prefix = os.path.join(posts_dir, '')
+            return [PostRecord(r[0], prefix + r[0], r[3], r[4], r[5], r[1], r[2])
+                    for r in self.conn.execute('SELECT * FROM posts ORDER BY filename')]
+
+    def sync(self, posts_dir, parse):
+        # Like refresh(), but returns only the delta since the last sync:
+        # (added or changed PostRecords, removed filenames)
+        with self.lock:
+            return self._sync(posts_dir, parse)
+
+    def snapshot(self, posts_dir, parse):
+        # Like refresh(), but nothing is written back: files changed since
+        # the last sync are parsed for this listing only. For readers off
+        # the GUI thread, whose scans must not use up the delta sync() and
+        # PostManager.get_changes report to the watcher.
+        with self.lock:
+            rows = {r[0]: r for r in self.conn.execute('SELECT * FROM posts')}
+            known = {name: (r[1], r[2]) for name, r in rows.items()}
+        entries = scan_posts(posts_dir)
+        records, changed = self._read_changed(entries, known, parse)
+        reread = {name for name, _, _ in changed}
+        prefix = os.path.join(posts_dir, '')
+        for name, _, _ in entries:
+            if name not in reread:
+                r = rows[name]
+                records.append(PostRecord(name, prefix + name, r[3], r[4], r[5], r[1], r[2]))
+        records.sort(key=lambda r: r.filename)
+        return records
+
+    def _read_changed(self, entries, known, parse):
+        # -> (PostRecords for entries whose stat differs from known, their scan entries)
+        changed = [e for e in entries
+                   if known.get(e[0]) != (e[2].st_mtime_ns, e[2].st_size)]
+        records = []
+        for name, path, st, meta in read_headers(changed, parse):
+            if meta is None:
+                continue
+            date = meta.get('date')
+            records.append(PostRecord(name, path, as_text(meta.get('title')) or name, as_text(date),
+                                      date_key(date), st.st_mtime_ns, st.st_size))
+        return records, changed
+
+    def _sync(self, posts_dir, parse):
+        known = {row[0]: (row[1], row[2]) for row in
+                 self.conn.execute('SELECT filename, mtime_ns, size FROM posts')}
+
+        entries = scan_posts(posts_dir)
+        seen = {name for name, _, _ in entries}
+        records, _ = self._read_changed(entries, known, parse)
+
+        removed = [name for name in known if name not in seen]
+        if records or removed:
+            self.conn.executemany('INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?)',
+                                  [(r.filename, r.mtime_ns, r.size, r.title, r.date, r.sort_date)
+                                   for r in records])
+            self.conn.executemany('DELETE FROM posts WHERE filename = ?', [(n,) for n in removed])
+            self.conn.commit()
+        return records, removed
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute('DELETE FROM posts')
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
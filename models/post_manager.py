@@ -1,50 +1,128 @@
 import os
 import re
 import datetime
+from models.frontmatter import parse_block, as_text, split_document
+from models.post_index import PostIndex
+from models.search_index import SearchIndex, ANY
 
 class PostManager:
-    def __init__(self, repo_path):
+    def __init__(self, repo_path, index_path=None):
         self.repo_path = repo_path
         self.posts_dir = os.path.join(repo_path, 'content', 'posts')
+        self.index = PostIndex(index_path)
+        self.search_index = SearchIndex()
+        # Called with the filename after save_post writes it
+        self.on_save = None
 
     def get_posts(self):
         if not os.path.exists(self.posts_dir):
             return []
-        
-        posts = []
-        for f in os.listdir(self.posts_dir):
-            if f.endswith('.md'):
-                path = os.path.join(self.posts_dir, f)
-                with open(path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                    meta = self._parse_frontmatter(content)
-                    posts.append({
-                        'filename': f,
-                        'path': path,
-                        'title': meta.get('title', f),
-                        'date': meta.get('date', ''),
-                        'content': content
-                    })
+
+        # Only files whose mtime/size changed since the last call are re-read,
+        # and only up to the closing '---' of their frontmatter
+        posts = self.index.refresh(self.posts_dir, self.read_header)
         # Sort by date descending
-        posts.sort(key=lambda x: x['date'], reverse=True)
+        posts.sort(key=lambda x: x.sort_date, reverse=True)
+        return posts
+
+    def list_posts(self):
+        # get_posts() for other threads (preview builds, link checks): the
+        # same listing, but the index is left alone so get_changes still
+        # reports the edits to the Posts tab's watcher
+        if not os.path.exists(self.posts_dir):
+            return []
+        posts = self.index.snapshot(self.posts_dir, self.read_header)
+        posts.sort(key=lambda x: x.sort_date, reverse=True)
         return posts
 
+    def get_changes(self):
+        # Delta since the previous get_posts/get_changes call:
+        # (added or changed records, removed filenames)
+        if not os.path.exists(self.posts_dir):
+            return [], []
+        changed, removed = self.index.sync(self.posts_dir, self.read_header)
+        for filename in removed:
+            self.search_index.remove(filename)
+        for post in changed:
+            signature = (post.mtime_ns, post.size)
+            # save_post already indexed our own writes
+            if self.search_index.signature(post.filename) != signature:
+                self._index_post(post.filename, signature)
+        return changed, removed
+
+    def build_search_index(self, posts):
+        # Bring the full-text index in line with a get_posts() listing; only
+        # posts whose mtime/size differ from what was indexed are re-read.
+        # Safe to run off the GUI thread: works from a snapshot, and each
+        # change only lands if the GUI thread hasn't re-indexed that post
+        # (save_post, get_changes) in the meantime.
+        indexed = self.search_index.snapshot()
+        current = set()
+        for post in posts:
+            current.add(post.filename)
+            signature = (post.mtime_ns, post.size)
+            seen = indexed.get(post.filename)
+            if seen != signature:
+                self._index_post(post.filename, signature, expected=seen)
+        for filename, seen in indexed.items():
+            if filename not in current:
+                self.search_index.remove(filename, expected=seen)
+
+    def search(self, query, limit=200):
+        return [filename for filename, _ in self.search_index.search(query, limit)]
+
+    def _index_post(self, filename, signature, content=None, expected=ANY):
+        if content is None:
+            try:
+                content = self.load_post(filename)
+            except (OSError, UnicodeDecodeError):
+                self.search_index.remove(filename, expected)
+                return
+        meta, body = self.split_post(content)
+        self.search_index.update(filename, as_text(meta.get('title')) or filename,
+                                 as_text(meta.get('tags')), body, signature, expected)
+
+    def read_header(self, path):
+        lines = []
+        with open(path, 'r', encoding='utf-8') as file:
+            if file.readline().rstrip('\r\n') != '---':
+                return {}
+            for line in file:
+                if line.startswith('---'):
+                    return self._parse_yaml_block(''.join(lines))
+                lines.append(line)
+        # Unterminated frontmatter is treated like none at all
+        return {}
+
+    def load_post(self, filename):
+        path = os.path.join(self.posts_dir, filename)
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def split_post(self, content):
+        # (frontmatter dict, markdown body)
+        return split_document(content)
+
     def _parse_frontmatter(self, content):
         meta = {}
         if content.startswith('---'):
             end = content.find('\n---', 3)
             if end != -1:
-                yaml_block = content[3:end]
-                for line in yaml_block.split('\n'):
-                    if ':' in line:
-                        key, val = line.split(':', 1)
-                        meta[key.strip()] = val.strip()
+                meta = self._parse_yaml_block(content[3:end])
         return meta
 
+    def _parse_yaml_block(self, yaml_block):
+        # YAML (C loader when available) with a fast path for flat headers
+        return parse_block(yaml_block)
+
     def save_post(self, filename, content):
         path = os.path.join(self.posts_dir, filename)
         with open(path, 'w', encoding='utf-8') as f:
             f.write(content)
+        st = os.stat(path)
+        self._index_post(filename, (st.st_mtime_ns, st.st_size), content)
+        if self.on_save:
+            self.on_save(filename)
             
     def create_post(self, title):
         slug = title.lower().replace(' ', '-').replace('[^a-z0-9-]', '')
@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Header reads are I/O-bound (cold cache, network mounts), so threads help
+# even with the GIL. Keep the pool bounded so we don't flood the filesystem.
+MAX_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+# Below this many files the pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+
+def scan_posts(posts_dir):
+    # One directory pass; DirEntry caches stat on most platforms
+    entries = []
+    with os.scandir(posts_dir) as it:
+        for entry in it:
+            if not entry.name.endswith('.md') or not entry.is_file():
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # removed between listing and stat
+            entries.append((entry.name, entry.path, st))
+    # Deterministic order regardless of filesystem listing order
+    entries.sort(key=lambda e: e[0])
+    return entries
+
+
+def read_headers(entries, parse, max_workers=None):
+    # entries: (name, path, stat) tuples as returned by scan_posts.
+    # Returns (name, path, stat, meta) in the same order; meta is None for
+    # files that could not be read.
+    def _read(entry):
+        name, path, st = entry
+        try:
+            return name, path, st, parse(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error reading post {name}: {e}")
+            return name, path, st, None
+
+    workers = max_workers or MAX_WORKERS
+    if len(entries) < PARALLEL_THRESHOLD or workers == 1:
+        return [_read(e) for e in entries]
+
+    # Hand each thread a contiguous slice instead of one future per file;
+    # per-task overhead otherwise dominates on a warm cache
+    step = -(-len(entries) // workers)
+    chunks = [entries[i:i + step] for i in range(0, len(entries), step)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, keeping results deterministic
+        return [r for chunk in pool.map(lambda c: [_read(e) for e in c], chunks) for r in chunk]
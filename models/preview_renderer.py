@@ -0,0 +1,174 @@
+import hashlib
+import re
+from collections import OrderedDict
+import markdown
+from models.highlight import highlight_html
+
+EXTENSIONS = ['fenced_code', 'tables']
+# Part of every persistent cache key; bump when output for the same input
+# changes (block splitting, highlighting, Markdown upgrade)
+RENDERER_VERSION = f"2/markdown-{markdown.__version__}"
+# Rendered blocks kept around; a long post is a few hundred blocks
+CACHE_SIZE = 4000
+
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+LIST_RE = re.compile(r'^ {0,3}([*+-]|\d+[.)])\s')
+REF_DEF_RE = re.compile(r'^ {0,3}\[[^\]]+\]:\s*\S')
+QUOTE_RE = re.compile(r'^ {0,3}>')
+HTML_START_RE = re.compile(r'^<([a-zA-Z][a-zA-Z0-9-]*)[\s/>]|^<!--')
+# Python-Markdown's block-level tags: a chunk opening with one of these is
+# raw HTML, which runs (blank lines and all) until the tag closes
+BLOCK_TAGS = frozenset(markdown.Markdown().block_level_elements)
+
+
+def _html_tag(line):
+    # Block-level tag a line opens ('!--' for a comment), or None
+    m = HTML_START_RE.match(line)
+    if not m:
+        return None
+    if m.group(1) is None:
+        return '!--'
+    tag = m.group(1).lower()
+    return tag if tag in BLOCK_TAGS else None
+
+
+def _html_open(tag, text):
+    # Whether raw HTML opened with `tag` is still open at the end of text
+    if tag == '!--':
+        return '-->' not in text
+    opened = len(re.findall(rf'<{tag}(?=[\s/>])', text, re.I))
+    closed = len(re.findall(rf'</{tag}\s*>', text, re.I))
+    return opened > closed
+
+
+def split_blocks(text):
+    # Top-level Markdown blocks, i.e. chunks that render the same on their
+    # own as inside the full document. Blank lines separate blocks except
+    # inside fenced code, before indented continuations, between items of
+    # the same list, between paragraphs of one blockquote and inside raw
+    # HTML blocks.
+    chunks = []
+    current = []
+    fence = None
+    for line in text.split('\n'):
+        if fence:
+            current.append(line)
+            if line.strip().startswith(fence):
+                fence = None
+            continue
+        m = FENCE_RE.match(line)
+        if m:
+            fence = m.group(1)
+            current.append(line)
+        elif line.strip():
+            current.append(line)
+        elif current:
+            chunks.append(current)
+            current = []
+    if current:
+        chunks.append(current)
+
+    blocks = []
+    prev_kind = None
+    html = None     # tag of a raw HTML block still open
+    for chunk in chunks:
+        first = chunk[0]
+        body = '\n'.join(chunk)
+        if html:
+            blocks[-1] += '\n\n' + body
+            if not _html_open(html, blocks[-1]):
+                html = None
+            continue
+        is_list = bool(LIST_RE.match(first))
+        is_quote = bool(QUOTE_RE.match(first))
+        continues = first[:1] in (' ', '\t') and not FENCE_RE.match(first)
+        if blocks and (continues or (is_list and prev_kind == 'list') or (is_quote and prev_kind == 'quote')):
+            blocks[-1] += '\n\n' + body
+            continue
+        blocks.append(body)
+        prev_kind = 'list' if is_list else 'quote' if is_quote else None
+        tag = _html_tag(first)
+        if tag and _html_open(tag, body):
+            html = tag
+    return blocks
+
+
+def _is_html_block(block):
+    # Raw HTML passes through with a blank line after it, as in a full pass
+    return _html_tag(block) is not None
+
+
+# Renders Markdown block by block with an LRU cache keyed by block hash, so
+# an edit only converts the blocks it touched. A single Markdown instance is
+# reused (reset() between blocks) instead of rebuilding the extension
+# pipeline on every call. With a RenderCache (store) whole documents are
+# looked up there first and results are written back to it.
+class BlockRenderer:
+    def __init__(self, extensions=None, cache_size=CACHE_SIZE, highlight=True, store=None):
+        self.store = store
+        self.extensions = list(extensions or EXTENSIONS)
+        self.md = markdown.Markdown(extensions=self.extensions)
+        self.highlight = highlight
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def document_key(self, text):
+        # hash(renderer version + extensions + body) for the RenderCache
+        header = f"{RENDERER_VERSION}\0{','.join(self.extensions)}\0{int(self.highlight)}\0"
+        return hashlib.sha1((header + text).encode('utf-8')).digest()
+
+    def render(self, text, persist=True):
+        # persist=False still reads the store but doesn't add to it (drafts
+        # mid-edit would only push useful entries out)
+        return self.render_hit(text, persist)[0]
+
+    def render_hit(self, text, persist=True):
+        # -> (html, whether it came from the store). Per call, unlike the
+        # store's counters, which every user of the store adds to.
+        key = None
+        if self.store is not None:
+            key = self.document_key(text)
+            html = self.store.get(key)
+            if html is not None:
+                return html, True
+        html = self._render_blocks(text)
+        if key is not None and persist:
+            self.store.put(key, html)
+        return html, False
+
+    def _render_blocks(self, text):
+        # Reference-style link definitions can live anywhere in the
+        # document; feed them to every block and make them part of the key
+        refs = ''
+        if ']:' in text:
+            refs = '\n'.join(line for line in text.split('\n') if REF_DEF_RE.match(line))
+        parts = []
+        for block in split_blocks(text):
+            html = self._render_block(block, refs)
+            if not html:
+                continue    # only link definitions
+            if parts:
+                parts.append('\n\n' if _is_html_block(previous) else '\n')
+            parts.append(html)
+            previous = block
+        return ''.join(parts)
+
+    def _render_block(self, block, refs):
+        key = hashlib.sha1((refs + '\x00' + block).encode('utf-8')).digest()
+        html = self.cache.get(key)
+        if html is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return html
+
+        self.misses += 1
+        source = block + '\n\n' + refs if refs else block
+        html = self.md.reset().convert(source)
+        if self.highlight:
+            html = highlight_html(html)
+        self.cache[key] = html
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return html
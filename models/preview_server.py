@@ -0,0 +1,279 @@
+# Local preview of the site. Serves the repository as the site's own build
+# script leaves it, with SiteBuilder's post previews under PREVIEW_PATH
+# (drafts the script hasn't built yet). Saving a post re-renders its
+# preview; open pages are told to reload over Server-Sent Events.
+import html
+import json
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+# Loopback only: the preview includes drafts and is never meant to be shared
+HOST = '127.0.0.1'
+# Tried first so reloading tabs find the server again after a restart;
+# falls back to any free port
+PREFERRED_PORT = 8017
+EVENTS_PATH = '/__livereload'
+# SiteBuilder's output is mounted here; everything else is the repository
+PREVIEW_DIR = '__preview'
+PREVIEW_PATH = f'/{PREVIEW_DIR}/'
+# Host names accepted (with the server's port), so a page on another site
+# can't reach the preview by rebinding its own name to 127.0.0.1
+LOCAL_NAMES = ('127.0.0.1', 'localhost', '[::1]')
+# Reload notice meaning "every page": the site's build script has run
+ALL_PAGES = '*'
+# Idle SSE connections get a comment this often, so dead tabs are noticed
+KEEPALIVE = 15.0
+# Rebuild notifications kept for clients that are between reads
+HISTORY = 64
+# stop() waits this long for the rebuild thread; a build still running
+# then finishes on its own and its result is dropped
+STOP_TIMEOUT = 0.5
+
+RELOAD_SCRIPT = """<script>
+(function () {
+  var page = location.pathname.replace(/^\\//, '');
+  if (page === '' || page.slice(-1) === '/') page += 'index.html';
+  var events = new EventSource('%s');
+  events.onmessage = function (e) {
+    var pages = JSON.parse(e.data);
+    if (pages.indexOf(page) >= 0 || pages.indexOf('%s') >= 0) location.reload();
+  };
+})();
+</script>
+""" % (EVENTS_PATH, ALL_PAGES)
+
+
+class PreviewServer:
+    """HTTP server on HOST for a repository and its SiteBuilder's output_dir.
+
+    request_rebuild() may be called from any thread; requests arriving while
+    a build runs are folded into one follow-up build. on_rebuilt(report,
+    latency, clients) and on_error(message) are called on the rebuild thread,
+    never after stop() has returned.
+    """
+
+    def __init__(self, builder, port=PREFERRED_PORT, on_rebuilt=None, on_error=None):
+        self.builder = builder
+        self.port = port
+        self.on_rebuilt = on_rebuilt or (lambda report, latency, clients: None)
+        self.on_error = on_error or (lambda message: None)
+        repo = builder.repo_path
+        # Preview pages link to images relative to content/, as posts do
+        self.site_roots = [repo, os.path.join(repo, 'content')]
+        self.preview_roots = [builder.output_dir] + self.site_roots
+        self.clients = 0
+        self._httpd = None
+        self._threads = []
+        self._cond = threading.Condition()
+        self._version = 0
+        self._events = []   # (version, [changed page paths])
+        self._requested = None  # perf_counter of the oldest unserved request
+        self._stopping = False
+
+    @property
+    def url(self):
+        return f"http://{HOST}:{self.port}/" if self._httpd else None
+
+    def start(self):
+        try:
+            httpd = ThreadingHTTPServer((HOST, self.port), _Handler)
+        except OSError:
+            httpd = ThreadingHTTPServer((HOST, 0), _Handler)
+        httpd.daemon_threads = True
+        httpd.preview = self
+        self._httpd = httpd
+        self.port = httpd.server_address[1]
+        self._stopping = False
+        self._threads = [threading.Thread(target=httpd.serve_forever, daemon=True),
+                         threading.Thread(target=self._rebuild_loop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        # Bring the output up to date before the first page is asked for
+        self.request_rebuild()
+        return self.url
+
+    def stop(self):
+        if not self._httpd:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        # Called on the GUI thread: don't wait out a long build
+        for thread in self._threads:
+            thread.join(STOP_TIMEOUT)
+        self._httpd = None
+        self._threads = []
+
+    def request_rebuild(self, source=None):
+        # source (a saved post's filename) is informational: the
+        # build itself works out which pages it affects
+        with self._cond:
+            if self._requested is None:
+                self._requested = time.perf_counter()
+            self._cond.notify_all()
+
+    def _rebuild_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or self._requested is not None)
+                if self._stopping:
+                    return
+                requested, self._requested = self._requested, None
+            try:
+                report = self.builder.build()
+            except Exception as e:
+                report, error = None, str(e)
+            # Delivered under the lock, so stop() either comes first and
+            # the result is dropped, or waits for the callbacks (they only
+            # queue signals)
+            with self._cond:
+                if self._stopping:
+                    return
+                if report is None:
+                    self.on_error(error)
+                    continue
+                pages = [f"{PREVIEW_DIR}/{page}" for page in report.written + report.removed]
+                if pages:
+                    self._publish(pages)
+                self.on_rebuilt(report, time.perf_counter() - requested, self.clients)
+
+    def site_built(self):
+        # The site's build script rewrote the repository: reload every page
+        self._publish([ALL_PAGES])
+
+    def _publish(self, pages):
+        with self._cond:
+            self._version += 1
+            self._events.append((self._version, pages))
+            del self._events[:-HISTORY]
+            self._cond.notify_all()
+
+    def wait_events(self, seen):
+        # -> (version, pages changed after `seen`), or None on shutdown.
+        # Returns the same version with no pages after KEEPALIVE idle.
+        with self._cond:
+            self._cond.wait_for(lambda: self._stopping or self._version != seen, KEEPALIVE)
+            if self._stopping:
+                return None
+            pages = [page for version, batch in self._events if version > seen for page in batch]
+            return self._version, pages
+
+    def allowed_host(self, host):
+        # Host header names this server: a loopback name and its port
+        name, sep, port = (host or '').lower().rpartition(':')
+        return bool(sep) and name in LOCAL_NAMES and port == str(self.port)
+
+    def resolve(self, url_path):
+        # Filesystem path for a request path, or None. Dot segments,
+        # dotfiles (.git, the preview manifest) and segments that could
+        # name another drive or directory on Windows are never served, nor
+        # is a file whose real path (symlinks followed) leaves its root.
+        parts = [p for p in unquote(url_path).split('/') if p]
+        for part in parts:
+            if part.startswith('.') or '\\' in part or ':' in part or '\0' in part \
+                    or os.path.splitdrive(part)[0]:
+                return None
+        roots = self.site_roots
+        if parts[:1] == [PREVIEW_DIR]:
+            roots, parts = self.preview_roots, parts[1:]
+        for root in roots:
+            path = os.path.join(root, *parts)
+            if os.path.isdir(path):
+                path = os.path.join(path, 'index.html')
+            if os.path.isfile(path) and _within(root, path):
+                return path
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        preview = self.server.preview
+        if not preview.allowed_host(self.headers.get('Host')):
+            self._send(403, 'text/plain', b'Unexpected Host header')
+            return
+        path = urlsplit(self.path).path
+        if path == EVENTS_PATH:
+            self._events(preview)
+            return
+        file_path = preview.resolve(path)
+        if file_path is None:
+            self._send(404, 'text/html; charset=utf-8',
+                       f"<h1>Not found</h1><p>{html.escape(path)}</p>{RELOAD_SCRIPT}".encode())
+            return
+        try:
+            with open(file_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            self._send(404, 'text/plain', b'Not found')
+            return
+        ctype = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        if ctype == 'text/html':
+            body = _inject(body)
+            ctype += '; charset=utf-8'
+        self._send(200, ctype, body)
+
+    def _send(self, code, ctype, body):
+        self.send_response(code)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _events(self, preview):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        with preview._cond:
+            preview.clients += 1
+            seen = preview._version
+        try:
+            # Reconnect quickly when the server is restarted
+            self.wfile.write(b'retry: 500\n\n')
+            self.wfile.flush()
+            while True:
+                result = preview.wait_events(seen)
+                if result is None:
+                    return
+                seen, pages = result
+                if pages:
+                    self.wfile.write(f"data: {json.dumps(pages)}\n\n".encode())
+                else:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            with preview._cond:
+                preview.clients -= 1
+
+
+def _within(root, path):
+    root = os.path.realpath(root)
+    try:
+        return os.path.commonpath([root, os.path.realpath(path)]) == root
+    except ValueError:  # another drive
+        return False
+
+
+def _inject(body):
+    # Live-reload hook before </body> (or at the end if there is none)
+    marker = body.rfind(b'</body>')
+    script = RELOAD_SCRIPT.encode()
+    if marker < 0:
+        return body + script
+    return body[:marker] + script + body[marker:]
@@ -0,0 +1,297 @@
+# Build -> detect changes -> stage -> commit -> push as one sequential job.
+# Runs on a worker thread; output and per-stage timings are reported through
+# callbacks so the UI can relay them.
+import codecs
+import hashlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from models.git_index import in_scope
+
+STAGES = ('build', 'detect', 'stage', 'commit', 'push')
+
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+LINE_RE = re.compile(r'([^\r\n]*)(\r\n|\r|\n)')
+
+# Inputs whose stat decides whether the site needs rebuilding
+BUILD_INPUTS = ('content', 'data.json', 'scripts')
+
+
+def build_command(repo_path):
+    # The site's own build script; None if the repo doesn't have one
+    script = os.path.join(repo_path, 'scripts', 'manage_posts.py')
+    if not os.path.exists(script):
+        return None
+    return ['python3', script, 'build']
+
+
+def input_signature(repo_path, inputs=BUILD_INPUTS):
+    # sha1 over (path, mtime_ns, size) of every build input
+    digest = hashlib.sha1()
+    for name in inputs:
+        top = os.path.join(repo_path, name)
+        if os.path.isfile(top):
+            st = os.stat(top)
+            digest.update(f"{name}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8', 'surrogateescape'))
+            continue
+        for root, dirs, files in os.walk(top):
+            dirs.sort()
+            for fname in sorted(files):
+                path = os.path.join(root, fname)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                rel = os.path.relpath(path, repo_path)
+                digest.update(f"{rel}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+class StageResult:
+    __slots__ = ('name', 'outcome', 'seconds', 'detail')
+
+    def __init__(self, name, outcome, seconds, detail=''):
+        self.name = name
+        self.outcome = outcome
+        self.seconds = seconds
+        self.detail = detail
+
+    def as_dict(self):
+        return {'stage': self.name, 'outcome': self.outcome,
+                'seconds': round(self.seconds, 3), 'detail': self.detail}
+
+
+class PublishPipeline:
+    """One publish run.
+
+    on_output(line, progress) receives streamed command output;
+    on_stage(result) is called as each StageResult is known. State files:
+    stamp_path remembers the build inputs of the last successful build and
+    the files that build wrote, timing_log gets one JSON line per run.
+
+    Only site files are published: content/, data.json and whatever the
+    build changed. Anything else dirty in the worktree is left alone.
+    """
+
+    def __init__(self, manager, message=None, stamp_path=None, timing_log=None,
+                 on_output=None, on_stage=None):
+        self.manager = manager
+        self.repo_path = manager.repo_path
+        self.message = message
+        self.stamp_path = stamp_path
+        self.timing_log = timing_log
+        self.on_output = on_output or (lambda line, progress: None)
+        self.on_stage = on_stage or (lambda result: None)
+        self.results = []
+        self._staged = []
+        self._unstaged = []
+        self._outputs = set()   # paths the site build writes
+        self._publish = []      # paths this run stages and commits
+        self._cancelled = False
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            if self._proc and self._proc.poll() is None:
+                self._proc.kill()
+
+    def run(self):
+        # -> list of StageResult; stops at the first failure
+        start = time.perf_counter()
+        changes = None
+        for name in STAGES:
+            if self._cancelled:
+                self._record(name, FAILED, 0.0, "cancelled")
+                break
+            began = time.perf_counter()
+            try:
+                outcome, detail, changes = getattr(self, f'_{name}')(changes)
+            except Exception as e:
+                outcome, detail = FAILED, str(e)
+            self._record(name, outcome, time.perf_counter() - began, detail)
+            if outcome == FAILED:
+                break
+        self._write_log(time.perf_counter() - start)
+        return self.results
+
+    # Stages: each takes and returns the change count carried between them
+
+    def _build(self, changes):
+        command = build_command(self.repo_path)
+        if not command:
+            return SKIPPED, "no scripts/manage_posts.py", changes
+        signature, self._outputs = self._read_stamp()
+        if input_signature(self.repo_path) == signature:
+            return SKIPPED, "inputs unchanged since last build", changes
+        before = self._dirty_stats()
+        code = self._stream(command)
+        if code != 0:
+            return FAILED, f"exit code {code}", changes
+        # Build outputs: files that became dirty or changed during the build
+        after = self._dirty_stats()
+        self._outputs |= {path for path, stat in after.items() if before.get(path, False) != stat}
+        # Taken after the build in case it writes into its own inputs
+        self._write_stamp(input_signature(self.repo_path), self._outputs)
+        return DONE, "", changes
+
+    def _detect(self, changes):
+        staged, unstaged, err = self.manager.get_status()
+        if err:
+            return FAILED, err, None
+        everything = {item.path for item in staged + unstaged}
+        self._staged = [item for item in staged if self._publishable(item)]
+        self._unstaged = [item for item in unstaged if self._publishable(item)]
+        self._publish = sorted({path for item in self._staged + self._unstaged
+                                for path in (item.path, item.orig_path) if path})
+        count = len({item.path for item in self._staged + self._unstaged})
+        left = len(everything) - count
+        note = f", {left} unrelated left out" if left else ""
+        if not count:
+            return SKIPPED, f"no site changes{note}", 0
+        return DONE, f"{count} changed file(s){note}", count
+
+    def _stage(self, changes):
+        if not self._unstaged:
+            return SKIPPED, "nothing unstaged", changes
+        paths = sorted({path for item in self._unstaged
+                        for path in (item.path, item.orig_path) if path})
+        _, err = self.manager.stage_files(paths)
+        if err:
+            return FAILED, err, changes
+        return DONE, f"{len(self._unstaged)} file(s)", changes
+
+    def _commit(self, changes):
+        if not changes:
+            return SKIPPED, "nothing to commit", changes
+        message = self.message or f"Publish {datetime.now():%Y-%m-%d %H:%M}"
+        # Commit just the publish paths: anything else the user had staged
+        # stays staged and out of this commit
+        with tempfile.NamedTemporaryFile('w', suffix='.pathspec', delete=False,
+                                         encoding='utf-8') as f:
+            f.write('\0'.join(self._publish))
+        try:
+            code = self._stream([self.manager.git_exec, '--literal-pathspecs']
+                                + self.manager.commit_args(message)
+                                + ['--pathspec-from-file', f.name, '--pathspec-file-nul'])
+        finally:
+            os.remove(f.name)
+        if code != 0:
+            return FAILED, f"exit code {code}", changes
+        return DONE, message.splitlines()[0], changes
+
+    def _push(self, changes):
+        branch = self.manager.current_branch()
+        if not self.manager.upstream():
+            return FAILED, (f"branch {branch or 'HEAD'} has no upstream; "
+                            f"push it once with `git push -u <remote> {branch or 'HEAD'}`"), changes
+        ahead = self.manager.ahead_count()
+        if ahead == 0:
+            return SKIPPED, "up to date with upstream", changes
+        code = self._stream([self.manager.git_exec] + self.manager.push_args())
+        if code != 0:
+            return FAILED, f"exit code {code}", changes
+        return DONE, f"{ahead} commit(s)" if ahead else "", changes
+
+    def _publishable(self, item):
+        return any(path and (in_scope(path) or self._is_output(path))
+                   for path in (item.path, item.orig_path))
+
+    def _is_output(self, path):
+        # Untracked output directories are reported (and recorded) as "dir/"
+        return any(path == out or (out.endswith('/') and path.startswith(out))
+                   for out in self._outputs)
+
+    def _dirty_stats(self):
+        # {path: (mtime_ns, size) or None} for every changed/untracked file
+        staged, unstaged, err = self.manager.get_status()
+        if err:
+            raise RuntimeError(err)
+        stats = {}
+        for item in staged + unstaged:
+            try:
+                st = os.stat(os.path.join(self.repo_path, item.path))
+                stats[item.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stats[item.path] = None
+        return stats
+
+    def _stream(self, args):
+        # Run args in the repo, relaying output line by line ('\r' updates
+        # are progress); returns the exit code
+        self.on_output(f"$ {' '.join(args)}", False)
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        with self._lock:
+            if self._cancelled:
+                return -1
+            self._proc = subprocess.Popen(args, cwd=self.repo_path, env=env,
+                                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                          stdin=subprocess.DEVNULL)
+        proc = self._proc
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        pending = ''
+        while True:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                break
+            pending += decoder.decode(chunk)
+            end = 0
+            for m in LINE_RE.finditer(pending):
+                end = m.end()
+                if m.group(1):
+                    self.on_output(m.group(1), m.group(2) == '\r')
+            pending = pending[end:]
+        if pending:
+            self.on_output(pending, False)
+        code = proc.wait()
+        self._proc = None
+        return -1 if self._cancelled else code
+
+    def _record(self, name, outcome, seconds, detail):
+        result = StageResult(name, outcome, seconds, detail)
+        self.results.append(result)
+        self.on_stage(result)
+
+    def _read_stamp(self):
+        # (input signature, {output paths}) of the last successful build.
+        # Line one is the signature, then one output path per line.
+        if not self.stamp_path:
+            return None, set()
+        try:
+            with open(self.stamp_path, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+        except OSError:
+            return None, set()
+        return lines[0].strip() or None, {line for line in lines[1:] if line}
+
+    def _write_stamp(self, signature, outputs):
+        if not self.stamp_path:
+            return
+        os.makedirs(os.path.dirname(self.stamp_path), exist_ok=True)
+        with open(self.stamp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join([signature] + sorted(outputs)))
+
+    def _write_log(self, total):
+        if not self.timing_log:
+            return
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'repo': self.repo_path,
+            'total': round(total, 3),
+            'stages': [r.as_dict() for r in self.results],
+        }
+        try:
+            os.makedirs(os.path.dirname(self.timing_log), exist_ok=True)
+            with open(self.timing_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError as e:
+            print(f"Could not write publish timings: {e}")
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA_VERSION = 2
+# Rendered HTML kept on disk; the oldest-used entries go first past this
+MAX_BYTES = 64 * 1024 * 1024
+# Evict down to this fraction of the limit so eviction doesn't run per put
+EVICT_TO = 0.9
+# A hit only rewrites last_used when the stored time is older than this,
+# so repeated hits stay read-only; eviction order is accurate to this much
+TOUCH_AFTER = 10 * 60
+
+
+# Persistent, size-bounded LRU of rendered Markdown. Keys are content
+# hashes (see BlockRenderer.document_key), so entries never go stale and the
+# preview, the build and the build's worker processes can all share one
+# file: each opens its own connection, sqlite does the locking.
+class RenderCache:
+    def __init__(self, db_path=None, max_bytes=MAX_BYTES):
+        self.db_path = db_path or ':memory:'
+        self.max_bytes = max_bytes
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        try:
+            self.conn = self._connect()
+        except sqlite3.DatabaseError as e:
+            # Corrupt cache file: it is only a cache, so start over
+            print(f"Render cache unreadable, rebuilding: {e}")
+            os.remove(self.db_path)
+            self.conn = self._connect()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        if self.db_path != ':memory:':
+            # Readers don't block the writer; commits needn't fsync
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS renders')
+            conn.execute('DROP TABLE IF EXISTS totals')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS renders (
+                key BLOB PRIMARY KEY,
+                html TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS renders_last_used ON renders(last_used)')
+        # Running byte total, kept in step with renders inside each write
+        conn.execute('CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)')
+        conn.execute('INSERT OR IGNORE INTO totals (id, bytes) VALUES (0, 0)')
+        conn.commit()
+        return conn
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute('SELECT html, last_used FROM renders WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - row[1] > TOUCH_AFTER:
+                with self.conn:
+                    self.conn.execute('UPDATE renders SET last_used = ? WHERE key = ?', (now, key))
+            return row[0]
+
+    def put(self, key, html):
+        size = len(html.encode('utf-8'))
+        if size > self.max_bytes // 2:
+            return
+        with self.lock, self.conn:
+            # Other processes write too; hold the write lock from the read on
+            self.conn.execute('BEGIN IMMEDIATE')
+            old = self.conn.execute('SELECT size FROM renders WHERE key = ?', (key,)).fetchone()
+            self.conn.execute('INSERT OR REPLACE INTO renders (key, html, size, last_used) VALUES (?, ?, ?, ?)',
+                              (key, html, size, time.time()))
+            self.conn.execute('UPDATE totals SET bytes = bytes + ? WHERE id = 0',
+                              (size - (old[0] if old else 0),))
+            total = self.conn.execute('SELECT bytes FROM totals WHERE id = 0').fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(total)
+
+    def _evict(self, total):
+        # Oldest-used first until under EVICT_TO of the limit
+        target = self.max_bytes * EVICT_TO
+        doomed = []
+        for key, size in self.conn.execute('SELECT key, size FROM renders ORDER BY last_used'):
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        self.conn.executemany('DELETE FROM renders WHERE key = ?', doomed)
+        self.conn.execute('UPDATE totals SET bytes = ? WHERE id = 0', (total,))
+
+    def stats(self):
+        # Entries/bytes on disk, plus this connection's hits and misses
+        with self.lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM renders').fetchone()[0]
+            size = self.conn.execute('SELECT bytes FROM totals WHERE id = 0').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute('DELETE FROM renders')
+            self.conn.execute('UPDATE totals SET bytes = 0 WHERE id = 0')
+            self.conn.commit()
+            self.hits = self.misses = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,184 @@
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Score multipliers per field; a hit in the title outranks body mentions
+TITLE_WEIGHT = 8.0
+TAGS_WEIGHT = 4.0
+BODY_WEIGHT = 1.0
+# Shortest final query token that is expanded as a prefix while typing
+MIN_PREFIX = 2
+# update()/remove() with expected=ANY apply unconditionally
+ANY = object()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+# Inverted index: token -> {doc_id: array of positions}. Positions run over
+# title, tags and body concatenated, so a doc only needs to know where its
+# title and tags end to tell which field a hit came from. The field-weighted
+# score of each (token, doc) pair is computed at index time so queries are
+# just dict intersections. Documents are replaced wholesale, which keeps
+# incremental updates simple: drop the doc's tokens, then add the new ones.
+class SearchIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = {}
+        self.weights = {}       # token -> {doc_id: field-weighted score}
+        self.doc_ids = {}       # filename -> doc_id
+        self.filenames = {}     # doc_id -> filename
+        self.doc_fields = {}    # doc_id -> (title_end, tags_end)
+        self.doc_tokens = {}    # doc_id -> tuple of distinct tokens
+        self.signatures = {}    # filename -> (mtime_ns, size) when indexed
+        self._next_id = 0
+        self._vocab = None      # sorted token list for prefix lookups
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def signature(self, filename):
+        return self.signatures.get(filename)
+
+    def snapshot(self):
+        # {filename: signature} of what is indexed right now
+        with self.lock:
+            return dict(self.signatures)
+
+    def update(self, filename, title, tags, body, signature=None, expected=ANY):
+        # expected: only replace the doc if it is still indexed with this
+        # signature (None: not indexed at all). A background refresh passes
+        # what it saw, so it never clobbers a newer save from the GUI thread.
+        title_tokens = tokenize(title)
+        tags_tokens = tokenize(tags)
+        tokens = title_tokens + tags_tokens + tokenize(body)
+
+        positions = {}
+        for pos, token in enumerate(tokens):
+            positions.setdefault(token, []).append(pos)
+
+        with self.lock:
+            if expected is not ANY and self.signatures.get(filename) != expected:
+                return
+            self._remove(filename)
+            doc_id = self._next_id
+            self._next_id += 1
+            self.doc_ids[filename] = doc_id
+            self.filenames[doc_id] = filename
+            fields = (len(title_tokens), len(title_tokens) + len(tags_tokens))
+            self.doc_fields[doc_id] = fields
+            self.doc_tokens[doc_id] = tuple(positions)
+            self.signatures[filename] = signature
+            for token, plist in positions.items():
+                bucket = self.postings.get(token)
+                if bucket is None:
+                    bucket = self.postings[token] = {}
+                    self.weights[token] = {}
+                    self._vocab = None
+                bucket[doc_id] = array('I', plist)
+                self.weights[token][doc_id] = self._weigh(fields, plist)
+
+    def remove(self, filename, expected=ANY):
+        with self.lock:
+            if expected is not ANY and self.signatures.get(filename) != expected:
+                return
+            self._remove(filename)
+
+    def _remove(self, filename):
+        doc_id = self.doc_ids.pop(filename, None)
+        if doc_id is None:
+            return
+        del self.filenames[doc_id]
+        del self.doc_fields[doc_id]
+        self.signatures.pop(filename, None)
+        for token in self.doc_tokens.pop(doc_id):
+            bucket = self.postings[token]
+            del bucket[doc_id]
+            del self.weights[token][doc_id]
+            if not bucket:
+                del self.postings[token]
+                del self.weights[token]
+                self._vocab = None
+
+    def search(self, query, limit=200):
+        # All terms must match (AND). The last bare term also matches as a
+        # prefix so results update while typing; "quoted phrases" must
+        # appear as consecutive tokens. Returns [(filename, score)] best first.
+        phrases = re.findall(r'"([^"]*)"', query)
+        bare = tokenize(re.sub(r'"[^"]*"', ' ', query))
+        prefix = bare.pop() if bare and not query.rstrip().endswith('"') else None
+
+        with self.lock:
+            scores = None
+            for term in bare:
+                scores = self._intersect(scores, self._score_token(term))
+            for phrase in phrases:
+                tokens = tokenize(phrase)
+                if tokens:
+                    scores = self._intersect(scores, self._score_phrase(tokens))
+            if prefix is not None:
+                scores = self._intersect(scores, self._score_prefix(prefix))
+            if not scores:
+                return []
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+            return [(self.filenames[doc_id], score) for doc_id, score in ranked]
+
+    def _intersect(self, scores, hits):
+        # Never mutates its inputs; hits may be a live weights bucket
+        if scores is None:
+            return hits
+        if len(hits) < len(scores):
+            scores, hits = hits, scores
+        return {doc_id: s + hits[doc_id] for doc_id, s in scores.items() if doc_id in hits}
+
+    def _weigh(self, fields, positions):
+        title_end, tags_end = fields
+        score = 0.0
+        for pos in positions:
+            if pos < title_end:
+                score += TITLE_WEIGHT
+            elif pos < tags_end:
+                score += TAGS_WEIGHT
+            else:
+                score += BODY_WEIGHT
+        return score
+
+    def _score_token(self, token):
+        return self.weights.get(token, {})
+
+    def _score_prefix(self, prefix):
+        if len(prefix) < MIN_PREFIX:
+            return self._score_token(prefix)
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        hits = {}
+        i = bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            for doc_id, s in self._score_token(self._vocab[i]).items():
+                hits[doc_id] = hits.get(doc_id, 0.0) + s
+            i += 1
+        return hits
+
+    def _score_phrase(self, tokens):
+        buckets = [self.postings.get(t) for t in tokens]
+        if not all(buckets):
+            return {}
+        hits = {}
+        # Walk the rarest token's docs, shifting every token's positions
+        # back by its offset in the phrase; common starts are phrase hits
+        for doc_id in min(buckets, key=len):
+            if not all(doc_id in b for b in buckets):
+                continue
+            starts = set(buckets[0][doc_id])
+            for k in range(1, len(tokens)):
+                starts.intersection_update([p - k for p in buckets[k][doc_id]])
+                if not starts:
+                    break
+            if starts:
+                hits[doc_id] = self._weigh(self.doc_fields[doc_id], starts) * len(tokens)
+        return hits
@@ -0,0 +1,292 @@
+# Post previews for the CMS. This is not the site's build: the repository's
+# own build script (scripts/manage_posts.py) produces the published pages
+# with the site's templates. This renders every post as a standalone page
+# in the editor's preview style, plus an index of them, into the CMS cache
+# so drafts can be browsed before that script runs:
+#
+#   content/posts/<name>.md  -> posts/<name>.html
+#   every post's title/date  -> index.html
+#
+# Pages are rewritten only when their inputs change. A manifest in the
+# output directory records the content hash of every source and the input
+# key every page was last written from.
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from models.frontmatter import as_text, split_document
+from models.highlight import style_css
+from models.preview_renderer import BlockRenderer
+from models.render_cache import RenderCache
+
+# Bump when templates or rendering change so every page is rewritten
+BUILD_VERSION = 2
+MANIFEST = '.build-manifest.json'
+
+LISTING = 'index.html'
+# Fewer stale posts than this render in-process: starting spawn workers
+# (an interpreter plus Markdown each) costs more than rendering them. A
+# preview rebuild after saving one post is always in-process.
+PARALLEL_MIN = 64
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; line-height: 1.6; max-width: 48rem; margin: 2rem auto; padding: 0 1rem; color: #333; }}
+h1, h2, h3 {{ color: #2a82da; }}
+pre {{ background: #f4f4f4; padding: 10px; border-radius: 5px; overflow-x: auto; }}
+img {{ max-width: 100%; }}
+nav a {{ margin-right: 1rem; }}
+{code_css}
+</style>
+</head>
+<body>
+<nav><a href="{root}index.html">All post previews</a></nav>
+{body}
+</body>
+</html>
+"""
+
+
+def post_target(filename):
+    return f"posts/{os.path.splitext(filename)[0]}.html"
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def render_page(title, body, depth, code_css):
+    return PAGE.format(title=html.escape(title), body=body, root='../' * depth, code_css=code_css)
+
+
+def post_header(meta, fallback_title):
+    # (title, HTML heading block) for a post's frontmatter
+    title = as_text(meta.get('title')) or fallback_title
+    date = as_text(meta.get('date'))
+    header = f"<h1>{html.escape(title)}</h1>"
+    if date:
+        header += f'\n<p class="date">{html.escape(date)}</p>'
+    return title, header
+
+
+def render_post_page(content, fallback_title, renderer, code_css):
+    # -> (page, body served from the render cache)
+    meta, body = split_document(content)
+    title, header = post_header(meta, fallback_title)
+    html, hit = renderer.render_hit(body)
+    return render_page(title, f"<article>\n{header}\n{html}\n</article>", 1, code_css), hit
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# Process pool side: each worker sets up its renderer (and with it one
+# Markdown instance) once, then renders whatever posts it is handed
+_worker_renderer = None
+_worker_css = None
+
+
+def _init_worker(extensions, store_path, store_bytes):
+    global _worker_renderer, _worker_css
+    # Workers share the parent's render cache file through their own connection
+    store = RenderCache(store_path, store_bytes) if store_path else None
+    _worker_renderer = BlockRenderer(extensions, store=store)
+    _worker_css = style_css('default')
+
+
+def _render_in_worker(job):
+    # -> (page, served from the render cache, CPU seconds spent on it)
+    path, fallback_title = job
+    start = time.process_time()
+    page, hit = render_post_page(_read_text(path), fallback_title, _worker_renderer, _worker_css)
+    return page, hit, time.process_time() - start
+
+
+class BuildReport:
+    __slots__ = ('written', 'skipped', 'removed', 'seconds', 'cpu', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.written = []
+        self.skipped = 0
+        self.removed = []
+        self.seconds = 0.0
+        # The building thread's CPU time plus what pool workers spent
+        # rendering (their interpreter start-up is not included)
+        self.cpu = 0.0
+        # Post bodies served from / added to the render cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __repr__(self):
+        return (f"BuildReport(written={len(self.written)}, skipped={self.skipped}, "
+                f"removed={len(self.removed)}, seconds={self.seconds:.3f})")
+
+
+class SiteBuilder:
+    def __init__(self, post_manager, output_dir, renderer=None, workers=None, parallel_min=PARALLEL_MIN):
+        self.posts = post_manager
+        self.repo_path = post_manager.repo_path
+        self.output_dir = output_dir
+        self.renderer = renderer or BlockRenderer()
+        # Processes for rendering batches of parallel_min stale posts or
+        # more; 1 keeps everything in-process
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min = max(2, parallel_min)
+        self.manifest = None
+        self._code_css = style_css('default')
+        # The Posts tab and the preview server build into the same directory
+        self.lock = threading.Lock()
+
+    def build(self, full=False):
+        # Bring the previews in output_dir up to date; full=True rewrites
+        # every page
+        with self.lock:
+            return self._build(full)
+
+    def _build(self, full):
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        report = BuildReport()
+        manifest = self._load_manifest()
+        # Kept even when everything is rewritten, so pages that are no
+        # longer produced still get removed
+        written_before = manifest.get('targets', {})
+        if full or manifest.get('version') != BUILD_VERSION:
+            manifest = {'version': BUILD_VERSION, 'sources': {}, 'targets': {}}
+        old_sources = manifest['sources']
+        old_targets = manifest['targets']
+        sources = {}
+        targets = {}
+
+        # The PostManager index already knows most posts' stat and header;
+        # read-only, since this runs off the GUI thread
+        posts = self.posts.list_posts()
+        extensions = ','.join(self.renderer.extensions)
+        stale = []
+        for post in posts:
+            target = post_target(post.filename)
+            digest = self._source_hash(post, old_sources.get(post.filename))
+            if digest is None:
+                continue
+            sources[post.filename] = [post.mtime_ns, post.size, digest]
+            targets[target] = _sha1(f"{BUILD_VERSION}\0{extensions}\0{digest}".encode())
+            if old_targets.get(target) == targets[target] and \
+                    os.path.exists(os.path.join(self.output_dir, target)):
+                report.skipped += 1
+            else:
+                stale.append((target, post))
+        # Pages come back in submission order, so the output is the same
+        # whichever way they were rendered
+        for (target, _), (page, hit, cpu) in zip(stale, self._render_posts([post for _, post in stale])):
+            report.cpu += cpu
+            self._write(os.path.join(self.output_dir, target), page)
+            report.written.append(target)
+            if hit:
+                report.cache_hits += 1
+            else:
+                report.cache_misses += 1
+
+        listed = [post for post in posts if post.filename in sources]
+        header_key = json.dumps([[p.filename, p.title, p.date] for p in listed])
+        targets[LISTING] = _sha1(f"{BUILD_VERSION}\0{header_key}".encode())
+        self._maybe_write(LISTING, targets[LISTING], old_targets, report,
+                          lambda: self._render_listing(listed))
+
+        # Pages whose source went away
+        for target in written_before:
+            if target not in targets:
+                try:
+                    os.remove(os.path.join(self.output_dir, target))
+                except OSError:
+                    pass
+                report.removed.append(target)
+
+        manifest = {'version': BUILD_VERSION, 'sources': sources, 'targets': targets}
+        self._save_manifest(manifest)
+        report.seconds = time.perf_counter() - start
+        report.cpu += time.thread_time() - start_cpu
+        return report
+
+    def _source_hash(self, post, previous):
+        # Same stat as last build: trust the recorded hash, don't re-read
+        if previous and previous[0] == post.mtime_ns and previous[1] == post.size:
+            return previous[2]
+        try:
+            with open(post.path, 'rb') as f:
+                return _sha1(f.read())
+        except OSError:
+            return None
+
+    def _maybe_write(self, target, key, old_targets, report, render):
+        path = os.path.join(self.output_dir, target)
+        if old_targets.get(target) == key and os.path.exists(path):
+            report.skipped += 1
+            return
+        self._write(path, render())
+        report.written.append(target)
+
+    def _write(self, path, text):
+        # Write-then-rename so a reader never sees half a page
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _page(self, title, body, depth):
+        return render_page(title, body, depth, self._code_css)
+
+    def _render_posts(self, posts):
+        # (page, cache hit, worker CPU seconds) for posts, in order. Big
+        # batches are spread over a process pool: Markdown conversion is pure
+        # Python and holds the GIL. This only speeds up previews (a first
+        # render, or the preview server catching up after a pull); the
+        # site's own build script runs outside the CMS and is left as is.
+        jobs = [(post.path, post.title or post.filename) for post in posts]
+        if self.workers <= 1 or len(jobs) < self.parallel_min:
+            for path, fallback in jobs:
+                # CPU spent here is the building thread's own
+                yield render_post_page(_read_text(path), fallback, self.renderer, self._code_css) + (0.0,)
+            return
+        workers = min(self.workers, len(jobs))
+        # spawn, not fork: the GUI process has Qt and pool threads running
+        context = multiprocessing.get_context('spawn')
+        store = self.renderer.store
+        store_path = store.db_path if store and store.db_path != ':memory:' else None
+        initargs = (self.renderer.extensions, store_path, store.max_bytes if store else 0)
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            yield from pool.map(_render_in_worker, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+
+    def _render_listing(self, posts):
+        items = []
+        for post in posts:
+            link = post_target(post.filename)
+            date = f' <span class="date">{html.escape(post.date)}</span>' if post.date else ''
+            items.append(f'<li><a href="{html.escape(link)}">{html.escape(post.title or post.filename)}</a>{date}</li>')
+        body = "<h1>Post previews</h1>\n<ul>\n" + "\n".join(items) + "\n</ul>"
+        return self._page("Post previews", body, 0)
+
+    def _load_manifest(self):
+        if self.manifest is None:
+            try:
+                with open(os.path.join(self.output_dir, MANIFEST), 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                self.manifest = {}
+        return self.manifest
+
+    def _save_manifest(self, manifest):
+        self.manifest = manifest
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._write(os.path.join(self.output_dir, MANIFEST), json.dumps(manifest))
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PySide6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_until(app, predicate, timeout=10.0):
+    # Run the event loop until predicate() holds; False on timeout
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        app.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # PySide6 6.12.0's Signal.emit() returns True without taking a reference,
+    # so each emit leaves True one reference short and the interpreter
+    # aborts at exit ("bool_dealloc"). True is immortal in practice; give
+    # back more references than any run here can take.
+    import ctypes
+    import PySide6
+    if PySide6.__version__.startswith('6.12.'):
+        for _ in range(100000):
+            ctypes.pythonapi.Py_IncRef(ctypes.py_object(True))
@@ -0,0 +1,71 @@
+# DirtyChecker: how often check_dirty still has to run git status
+import os
+import subprocess
+
+import pytest
+
+from models.git_manager import GitManager
+
+IDENTITY = ['-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+
+
+def git(cwd, *args):
+    subprocess.run(['git', *IDENTITY, *args], cwd=cwd, check=True, capture_output=True)
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, 'content', 'posts'))
+    write(os.path.join(root, 'content', 'posts', 'a.md'), 'a\n')
+    write(os.path.join(root, '.gitignore'), '*.tmp\n')
+    git(root, 'init', '-q')
+    git(root, 'add', '-A')
+    git(root, 'commit', '-q', '-m', 'initial')
+    manager = GitManager(root)
+    yield root, manager
+    manager.close()
+
+
+def poll(manager):
+    # -> (dirty, paths, git processes started)
+    before = manager.spawn_count
+    dirty, paths = manager.check_dirty()
+    return dirty, paths, manager.spawn_count - before
+
+
+def test_reported_untracked_file_settles_dirty(repo):
+    root, manager = repo
+    poll(manager)
+    write(os.path.join(root, 'content', 'posts', 'new.md'), 'new\n')
+    assert poll(manager) == (True, ['content/posts/new.md'], 1)
+    # Known to git and unchanged: no more status runs
+    assert poll(manager) == (True, ['content/posts/new.md'], 0)
+    write(os.path.join(root, 'content', 'posts', 'new.md'), 'edited\n')
+    assert poll(manager)[2] == 1
+
+
+def test_ignored_files_are_asked_about_once_and_forgotten(repo):
+    root, manager = repo
+    poll(manager)
+    scratch = os.path.join(root, 'content', 'posts', 'x.tmp')
+    write(scratch, 'scratch\n')
+    assert poll(manager) == (False, [], 1)
+    assert poll(manager) == (False, [], 0)
+    os.remove(scratch)
+    poll(manager)
+    assert manager.dirty_checker._ignored == set()
+
+
+def test_ignore_rule_change_asks_again(repo):
+    root, manager = repo
+    poll(manager)
+    write(os.path.join(root, 'content', 'posts', 'new.md'), 'new\n')
+    poll(manager)
+    write(os.path.join(root, '.gitignore'), '*.tmp\nnew.md\n')
+    assert poll(manager) == (False, [], 1)
@@ -0,0 +1,148 @@
+# GitJobRunner against a local bare repository standing in for the remote
+import os
+import subprocess
+
+import pytest
+
+from PySide6.QtCore import QProcess
+
+from conftest import wait_until
+from utils.git_jobs import GitJobRunner, MAX_CAPTURE
+
+IDENTITY = ['-c', 'user.name=Test', '-c', 'user.email=test@example.com']
+
+
+def git(cwd, *args):
+    return subprocess.run(['git', *IDENTITY, *args], cwd=cwd, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repos(tmp_path):
+    remote = tmp_path / 'remote.git'
+    subprocess.run(['git', 'init', '-q', '--bare', str(remote)], check=True)
+    work = tmp_path / 'work'
+    subprocess.run(['git', 'clone', '-q', str(remote), str(work)], check=True, capture_output=True)
+    git(work, 'checkout', '-q', '-b', 'main')
+    git(work, 'commit', '-q', '--allow-empty', '-m', 'initial')
+    git(work, 'push', '-q', '-u', 'origin', 'main')
+    return remote, work
+
+
+class Recorder:
+    def __init__(self, runner):
+        self.lines = []
+        self.started = []
+        self.finished = []
+        runner.output.connect(lambda line, progress: self.lines.append((line, progress)))
+        runner.started.connect(self.started.append)
+        runner.finished.connect(lambda label, code, output: self.finished.append((label, code, output)))
+
+
+def make_runner(work):
+    runner = GitJobRunner('git', str(work))
+    return runner, Recorder(runner)
+
+
+def test_push_streams_progress(qapp, repos):
+    remote, work = repos
+    with open(os.path.join(work, 'blob.bin'), 'wb') as f:
+        f.write(os.urandom(256 * 1024))
+    git(work, 'add', 'blob.bin')
+    git(work, 'commit', '-q', '-m', 'add blob')
+    runner, rec = make_runner(work)
+    runner.submit('Push', ['push', '--progress'])
+    assert wait_until(qapp, lambda: rec.finished)
+    assert rec.finished[0][:2] == ('Push', 0)
+    # '\r'-terminated updates arrive flagged as progress, the rest as lines
+    assert any(progress for _, progress in rec.lines)
+    assert any(not progress and line.startswith('$ git push') for line, progress in rec.lines)
+    assert git(remote, 'rev-parse', 'main') == git(work, 'rev-parse', 'HEAD')
+
+
+def test_commit_then_push_run_in_order_and_pull_sees_them(qapp, repos, tmp_path):
+    remote, work = repos
+    # A second checkout that is behind once the push lands
+    other = tmp_path / 'other'
+    subprocess.run(['git', 'clone', '-q', '-b', 'main', str(remote), str(other)],
+                   check=True, capture_output=True)
+    with open(os.path.join(work, 'post.md'), 'w') as f:
+        f.write('hello\n')
+    git(work, 'add', 'post.md')
+    runner, rec = make_runner(work)
+    runner.submit('Commit', IDENTITY + ['commit', '-m', 'add post'])
+    runner.submit('Push', ['push', '--progress'])
+    assert runner.is_busy()
+    assert wait_until(qapp, lambda: len(rec.finished) == 2)
+    assert rec.started == ['Commit', 'Push']
+    assert [code for _, code, _ in rec.finished] == [0, 0]
+
+    puller, prec = make_runner(other)
+    puller.submit('Pull', ['pull', '--rebase', '--progress'])
+    assert wait_until(qapp, lambda: prec.finished)
+    assert prec.finished[0][1] == 0
+    assert os.path.exists(os.path.join(other, 'post.md'))
+
+
+def test_failure_drops_queued_jobs(qapp, repos):
+    _, work = repos
+    runner, rec = make_runner(work)
+    results = []
+    runner.submit('Bad push', ['push', 'no-such-remote'], callback=lambda code, out: results.append(code))
+    runner.submit('Never', ['status'])
+    assert wait_until(qapp, lambda: rec.finished and not runner.is_busy())
+    assert rec.started == ['Bad push']
+    assert results and results[0] != 0
+    assert any('Skipping 1 queued job' in line for line, _ in rec.lines)
+
+
+def test_failure_can_keep_the_queue(qapp, repos):
+    _, work = repos
+    runner, rec = make_runner(work)
+    runner.submit('Bad push', ['push', 'no-such-remote'], stop_queue_on_error=False)
+    runner.submit('Status', ['status'])
+    assert wait_until(qapp, lambda: len(rec.finished) == 2)
+    assert rec.started == ['Bad push', 'Status']
+    assert rec.finished[1][1] == 0
+
+
+def test_cancel_kills_running_job_and_clears_queue(qapp, repos):
+    _, work = repos
+    runner, rec = make_runner(work)
+    # Reads stdin, which stays open: runs until killed
+    runner.submit('Hang', ['hash-object', '--stdin'])
+    runner.submit('Queued', ['status'])
+    assert wait_until(qapp, lambda: runner.process and runner.process.state() == QProcess.Running)
+    runner.cancel()
+    assert wait_until(qapp, lambda: rec.finished and not runner.is_busy())
+    assert rec.finished[0][:2] == ('Hang', -1)
+    assert rec.started == ['Hang']
+    assert ('Cancelled.', False) in rec.lines
+
+
+class FakeProcess:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def readAllStandardOutput(self):
+        return self.chunks.pop(0)
+
+
+def test_output_split_across_reads(qapp):
+    runner, rec = make_runner('.')
+    runner.process = FakeProcess([b'Counting: 1', b'0%\rCounting: 100%\r\nDo', b'ne.\n'])
+    for _ in range(3):
+        runner._on_output()
+    assert rec.lines == [('Counting: 10%', True), ('Counting: 100%', False), ('Done.', False)]
+
+
+def test_captured_output_is_bounded(qapp):
+    # Long lines, so few emits: PySide6 6.12's Signal.emit() drops a
+    # reference to True each call, and thousands abort the interpreter
+    runner = GitJobRunner('git', '.')
+    line = 'x' * 1000
+    runner.process = FakeProcess([(line + '\n').encode() * 100])
+    runner._on_output()
+    assert runner._captured_chars <= MAX_CAPTURE
+    assert runner._captured_chars == sum(len(l) for l in runner._captured)
+    assert list(runner._captured)[-1] == line
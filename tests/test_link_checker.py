@@ -0,0 +1,124 @@
+# LinkChecker over a small site, external URLs answered by a local stand-in
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from models.link_checker import (LinkChecker, HttpChecker, extract_links,
+                                 MISSING, CASE, BROKEN)
+from models.post_manager import PostManager
+
+# Paths the stand-in answers 200 for; anything else is a 404
+LIVE = {'/ok', '/wiki/Foo_(bar)', '/project'}
+
+
+class StandIn(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200 if self.path in LIVE else 404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def site(tmp_path, base_url):
+    root = str(tmp_path)
+    posts = os.path.join(root, 'content', 'posts')
+    write(os.path.join(root, 'content', 'images', 'photo.png'), '')
+    write(os.path.join(posts, 'one.md'),
+          "---\ntitle: One\n---\n\n"
+          "![photo](../images/photo.png)\n"
+          "![gone](../images/gone.png)\n"
+          "See [two](two.html) and [Foo](" + base_url + "/wiki/Foo_(bar)).\n")
+    write(os.path.join(posts, 'two.md'),
+          "---\ntitle: Two\n---\n\n"
+          "![shouty](../images/Photo.PNG \"title\")\n"
+          "[live](" + base_url + "/ok) [dead](<" + base_url + "/dead>)\n\n"
+          "```\n[in code](nowhere.md)\n```\n")
+    write(os.path.join(root, 'data.json'), json.dumps({
+        'hero': {'firstName': 'Test'},
+        'projects': [{'name': 'local', 'link': 'content/images/photo.png'},
+                     {'name': 'missing', 'link': 'content/images/nope.png'},
+                     {'name': 'live', 'link': base_url + '/project'},
+                     {'name': 'dead', 'link': base_url + '/gone'}],
+    }))
+    manager = PostManager(root)
+    manager.get_posts()
+    return LinkChecker(manager)
+
+
+def issues_by_target(report):
+    return {issue.ref.target: issue for issue in report.issues}
+
+
+def test_inline_targets_may_contain_balanced_parentheses():
+    text = ("[a](https://en.wikipedia.org/wiki/Foo_(bar)) "
+            "[b](https://x.test/(a(b)c) \"title\") [c](<with space.md>) [d](a\\)b)")
+    assert [ref.target for ref in extract_links('p.md', text)] == \
+        ['https://en.wikipedia.org/wiki/Foo_(bar)', 'https://x.test/(a(b)c)', 'with space.md', 'a)b']
+
+
+def test_local_links(site):
+    report = site.check()
+    issues = issues_by_target(report)
+    assert issues['../images/gone.png'].status == MISSING
+    assert issues['../images/gone.png'].ref.line == 6
+    assert issues['../images/Photo.PNG'].status == CASE
+    assert issues['content/images/nope.png'].status == MISSING
+    # Found on disk, built as .html from a .md, or inside a code block
+    for target in ('../images/photo.png', 'two.html', 'content/images/photo.png', 'nowhere.md'):
+        assert target not in issues
+    # External URLs are counted but not requested without a url_checker
+    assert not any(issue.status == BROKEN for issue in report.issues)
+    assert report.external == 5
+
+
+def test_external_links(site, base_url):
+    site.url_checker = HttpChecker(timeout=5)
+    issues = issues_by_target(site.check())
+    assert issues[base_url + '/dead'].detail == 'HTTP 404'
+    assert issues[base_url + '/dead'].ref.source == 'two.md'
+    # /wiki/Foo_(bar) is live only when requested with its closing paren
+    assert {target for target, issue in issues.items() if issue.status == BROKEN} == \
+        {base_url + '/dead', base_url + '/gone'}
+
+
+def test_data_json_link_fields(site, base_url):
+    site.url_checker = HttpChecker(timeout=5)
+    issues = [issue for issue in site.check().issues if issue.ref.source == 'data.json']
+    assert sorted((issue.ref.line, issue.status) for issue in issues) == \
+        [('projects[1].link', MISSING), ('projects[3].link', BROKEN)]
+
+
+def test_added_file_clears_missing(site):
+    assert '../images/gone.png' in issues_by_target(site.check())
+    # The cached listing of content/images is rescanned once its mtime moves
+    write(os.path.join(site.repo_path, 'content', 'images', 'gone.png'), '')
+    assert '../images/gone.png' not in issues_by_target(site.check())
+
+
+def test_check_leaves_changes_for_the_watcher(site):
+    write(os.path.join(site.repo_path, 'content', 'posts', 'three.md'), "---\ntitle: Three\n---\n\n[x](gone.md)\n")
+    assert 'gone.md' in issues_by_target(site.check())
+    changed, removed = site.posts.get_changes()
+    assert [post.filename for post in changed] == ['three.md']
@@ -0,0 +1,32 @@
+# Background listings must leave the watcher's delta to get_changes
+import os
+
+from models.post_manager import PostManager
+from models.site_builder import SiteBuilder
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_preview_build_leaves_changes_for_the_watcher(tmp_path):
+    posts = tmp_path / 'content' / 'posts'
+    posts.mkdir(parents=True)
+    for name in ('a', 'b'):
+        write(posts / f'{name}.md', f"---\ntitle: {name}\n---\n\nbody\n")
+    manager = PostManager(str(tmp_path))
+    manager.get_posts()
+    builder = SiteBuilder(manager, str(tmp_path / 'out'), workers=1)
+    builder.build()
+
+    manager.save_post('b.md', "---\ntitle: Renamed\n---\n\nbody\n")
+    os.remove(posts / 'a.md')
+    report = builder.build()
+    assert sorted(report.written) == ['index.html', 'posts/b.html']
+    assert report.removed == ['posts/a.html']
+    assert [p.title for p in manager.list_posts()] == ['Renamed']
+
+    changed, removed = manager.get_changes()
+    assert [p.title for p in changed] == ['Renamed']
+    assert removed == ['a.md']
@@ -0,0 +1,44 @@
+# Block-by-block rendering must match one full Markdown pass
+import markdown
+import pytest
+
+from models.preview_renderer import BlockRenderer, EXTENSIONS, split_blocks
+
+DOCUMENTS = {
+    'paragraphs': "# Title\n\nOne *two*.\n\nThree\nfour.\n\nSetext\n------\n\nEnd.",
+    'lists': "- a\n\n- b\n\n    continued\n\n1. one\n2. two\n\nafter",
+    'fences': "```python\nx = 1\n\n\ny = 2\n```\n\n~~~\n> not a quote\n~~~\n\ntext",
+    'table': "| a | b |\n|---|---|\n| 1 | 2 |\n\nbelow",
+    'references': "See [the site][site].\n\nAgain [site].\n\n[site]: https://example.com",
+    'blockquotes': "> one\n\n> two\nlazy\n\n> - item\n\nplain\n\n> three",
+    'html': "<div>\n\nhello\n\n</div>\n\npara\n\n<div class=\"x\">\n<p>a</p>\n\n<p>b</p>\n</div>",
+    'nested html': "<div>\n<div>\n\nx\n\n</div>\n\ny\n</div>\n\nz\n\n<hr>\n\nlast",
+    'comment': "<!--\n\nhidden\n\n-->\n\npara",
+    'unclosed html': "intro\n\n<div>\nopen\n\nrest",
+    'inline html': "<span>inline</span> text\n\nnext",
+}
+
+
+@pytest.mark.parametrize('name', sorted(DOCUMENTS))
+def test_matches_full_render(name):
+    text = DOCUMENTS[name]
+    renderer = BlockRenderer(highlight=False)
+    expected = markdown.markdown(text, extensions=EXTENSIONS)
+    assert renderer.render(text) == expected
+    # Served from the block cache the second time, still identical
+    assert renderer.render(text) == expected
+    assert renderer.hits
+
+
+def test_edit_rerenders_only_touched_blocks():
+    renderer = BlockRenderer(highlight=False)
+    text = DOCUMENTS['paragraphs']
+    renderer.render(text)
+    misses = renderer.misses
+    renderer.render(text.replace('End.', 'The end.'))
+    assert renderer.misses == misses + 1
+
+
+def test_raw_html_and_quotes_stay_whole():
+    assert len(split_blocks(DOCUMENTS['html'])) == 3
+    assert split_blocks("> one\n\n> two\n\nplain") == ["> one\n\n> two", "plain"]
@@ -0,0 +1,26 @@
+# SiteBuilder: which batches are worth a process pool
+import models.site_builder as site_builder
+from models.post_manager import PostManager
+from models.site_builder import SiteBuilder
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_small_batches_render_in_process(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('process pool started for a small batch')
+
+    monkeypatch.setattr(site_builder, 'ProcessPoolExecutor', no_pool)
+    posts = tmp_path / 'content' / 'posts'
+    posts.mkdir(parents=True)
+    for i in range(3):
+        write(posts / f'p{i}.md', f"---\ntitle: P{i}\n---\n\nbody\n")
+    manager = PostManager(str(tmp_path))
+    builder = SiteBuilder(manager, str(tmp_path / 'out'), workers=8, parallel_min=4)
+    assert len(builder.build().written) == 4
+    # Saving one post re-renders just that page
+    manager.save_post('p1.md', "---\ntitle: P1\n---\n\nedited\n")
+    assert builder.build().written == ['posts/p1.html']
@@ -0,0 +1,104 @@
+import json
+import os
+import statistics
+from collections import deque
+from datetime import datetime
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QLabel,
+                               QListWidget, QPushButton)
+from PySide6.QtGui import QFontDatabase
+
+# Lines of build output kept in the console
+MAX_LINES = 5000
+# Builds shown in (and reloaded into) the duration history
+HISTORY = 20
+# A build this much slower than the median of its kind is flagged
+SLOW_FACTOR = 1.5
+
+
+# Streamed build output with bounded scrollback, the last result, and a
+# history of recent build durations (persisted as JSON lines)
+class BuildConsole(QWidget):
+    def __init__(self, history_path=None, parent=None):
+        super().__init__(parent)
+        self.history_path = history_path
+        self.history = deque(maxlen=HISTORY)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        top = QHBoxLayout()
+        self.status_label = QLabel("Build Output")
+        self.clear_btn = QPushButton("Clear")
+        self.clear_btn.clicked.connect(lambda: self.log_view.clear())
+        top.addWidget(self.status_label)
+        top.addStretch()
+        top.addWidget(self.clear_btn)
+
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(MAX_LINES)
+        self.log_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        self.history_list = QListWidget()
+        self.history_list.setMaximumHeight(90)
+
+        layout.addLayout(top)
+        layout.addWidget(self.log_view)
+        layout.addWidget(QLabel("Recent builds"))
+        layout.addWidget(self.history_list)
+        self._load_history()
+
+    def append(self, line):
+        self.log_view.appendPlainText(line)
+
+    def build_started(self, label):
+        self.status_label.setText(f"{label}: running...")
+
+    def build_queued(self, label):
+        self.status_label.setText(f"{label}: running, another build queued")
+
+    def build_finished(self, label, exit_code, wall, cpu=None):
+        ok = exit_code == 0
+        cpu_text = f", CPU {cpu:.2f}s" if cpu is not None else ""
+        result = "ok" if ok else f"failed (exit code {exit_code})"
+        self.status_label.setText(f"{label}: {result} in {wall:.2f}s{cpu_text}")
+        self.append(f"--- {label} {result}, wall {wall:.2f}s{cpu_text}")
+        entry = {'time': datetime.now().isoformat(timespec='seconds'), 'label': label,
+                 'exit_code': exit_code, 'wall': round(wall, 3),
+                 'cpu': round(cpu, 3) if cpu is not None else None}
+        self.history.append(entry)
+        self._save_entry(entry)
+        self._show_history()
+
+    def _show_history(self):
+        self.history_list.clear()
+        for entry in reversed(self.history):
+            walls = [e['wall'] for e in self.history if e['label'] == entry['label'] and e['exit_code'] == 0]
+            slow = len(walls) >= 3 and entry['wall'] > SLOW_FACTOR * statistics.median(walls)
+            cpu = f", CPU {entry['cpu']:.2f}s" if entry.get('cpu') is not None else ""
+            status = "ok" if entry['exit_code'] == 0 else f"exit {entry['exit_code']}"
+            text = f"{entry['time']}  {entry['label']}  {entry['wall']:.2f}s{cpu}  {status}"
+            self.history_list.addItem(text + ("  (slow)" if slow else ""))
+
+    def _load_history(self):
+        if not self.history_path or not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                lines = deque(f, maxlen=HISTORY)
+        except OSError:
+            return
+        for line in lines:
+            try:
+                self.history.append(json.loads(line))
+            except ValueError:
+                continue
+        self._show_history()
+
+    def _save_entry(self, entry):
+        if not self.history_path:
+            return
+        try:
+            with open(self.history_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            print(f"Could not record build time: {e}")
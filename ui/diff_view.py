@@ -0,0 +1,97 @@
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QColor, QFontDatabase
+
+# Rows exposed per fetchMore(); a 20 MB diff is laid out a screenful at a time
+FETCH_BATCH = 1000
+# Lines longer than this (minified JSON, generated HTML) are cut for display
+MAX_LINE = 2000
+
+ADDED = QColor(110, 200, 110)
+REMOVED = QColor(230, 100, 100)
+HUNK = QColor(90, 170, 240)
+HEADER = QColor(200, 170, 90)
+
+
+class DiffModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lines = []
+        self._loaded = 0
+
+    def set_lines(self, lines):
+        self.beginResetModel()
+        self._lines = lines
+        self._loaded = min(FETCH_BATCH, len(self._lines))
+        self.endResetModel()
+
+    def text(self):
+        return '\n'.join(self._lines)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._lines)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self._lines) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        line = self._lines[index.row()]
+        if role == Qt.DisplayRole:
+            if len(line) > MAX_LINE:
+                return line[:MAX_LINE] + f" ... ({len(line) - MAX_LINE} more characters)"
+            return line
+        if role == Qt.ForegroundRole:
+            return self._color(line)
+        return None
+
+    def _color(self, line):
+        if line.startswith(('+++', '---', 'diff --git', 'index ', 'new file', 'deleted file')):
+            return HEADER
+        if line.startswith('@@'):
+            return HUNK
+        if line.startswith('+'):
+            return ADDED
+        if line.startswith('-'):
+            return REMOVED
+        return None
+
+
+# Read-only diff display: one row per line with +/- colouring, fetched
+# lazily as the user scrolls instead of laying out the whole text up front
+class DiffView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.diff_model = DiffModel(self)
+        self.setModel(self.diff_model)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+    def set_diff(self, text):
+        self.set_lines(text.split('\n') if text else [])
+
+    def set_lines(self, lines):
+        # Splitting megabytes of text is worth doing off the GUI thread;
+        # callers that can should pass lines
+        self.diff_model.set_lines(lines)
+        self.scrollToTop()
+
+    def toPlainText(self):
+        return self.diff_model.text()
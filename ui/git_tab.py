@@ -1,24 +1,62 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                                  QPushButton, QTextEdit, QLabel, QSplitter, QMessageBox, 
-                                 QGroupBox, QListWidget)
-from PySide6.QtCore import Qt
+                                 QGroupBox, QListWidget, QPlainTextEdit, QAbstractItemView, QTabWidget)
+from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import Qt, QThreadPool
 from models.git_manager import GitManager
+from models.git_status import diff_items
+from ui.diff_view import DiffView
+from ui.history_view import HistoryView
+from models.publish import DONE, FAILED, SKIPPED
+from utils.git_jobs import GitJobRunner
+from utils.publish_job import PublishJob
+from utils.settings import SettingsManager
+from utils.workers import Worker
 
 class GitTab(QWidget):
     def __init__(self, repo_path):
         super().__init__()
         self.repo_path = repo_path
         self.manager = None
-        if repo_path:
-            self.manager = GitManager(repo_path)
+        self.jobs = None
+        self._last_progress = False
+        # One generation per view, so a diff and a commit load in flight
+        # together don't discard each other's result
+        self._diff_gen = 0
+        self._commit_gen = 0
+        self._diff_workers = set()
+        self._status_gen = 0
+        self._status_workers = set()
+        self._staged = []
+        self._unstaged = []
+        self._by_label = {}
+        self._history_stale = True
+        self.publish_job = None
             
         self._init_ui()
-        if self.manager:
-            self._refresh_status()
+        if repo_path:
+            self.set_repo_path(repo_path)
 
     def set_repo_path(self, path):
         self.repo_path = path
+        if self.manager:
+            self.manager.close()
+        if self.publish_job:
+            self.publish_job.cancel()
+        if self.jobs:
+            self.jobs.cancel()
+            self.jobs.deleteLater()
         self.manager = GitManager(path)
+        self._staged, self._unstaged = [], []
+        self._by_label = {}
+        self.unstaged_list.clear()
+        self.staged_list.clear()
+        self._reload_history()
+        self.jobs = GitJobRunner(self.manager.git_exec, path, self)
+        self.jobs.output.connect(self._append_log)
+        self.jobs.started.connect(self._on_job_started)
+        self.jobs.finished.connect(self._on_job_finished)
+        self.jobs.queue_changed.connect(self._update_job_state)
         self._refresh_status()
 
     def _init_ui(self):
@@ -42,22 +80,34 @@ class GitTab(QWidget):
         unstaged_group = QGroupBox("Unstaged Changes")
         u_layout = QVBoxLayout()
         self.unstaged_list = QListWidget()
+        self.unstaged_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.unstaged_list.itemClicked.connect(self._on_unstaged_select)
         self.stage_btn = QPushButton("Stage Selected")
         self.stage_btn.clicked.connect(self._stage_selected)
+        self.stage_all_btn = QPushButton("Stage All")
+        self.stage_all_btn.clicked.connect(self._stage_all)
+        u_btns = QHBoxLayout()
+        u_btns.addWidget(self.stage_btn)
+        u_btns.addWidget(self.stage_all_btn)
         u_layout.addWidget(self.unstaged_list)
-        u_layout.addWidget(self.stage_btn)
+        u_layout.addLayout(u_btns)
         unstaged_group.setLayout(u_layout)
 
         # Staged Files
         staged_group = QGroupBox("Staged Changes")
         s_layout = QVBoxLayout()
         self.staged_list = QListWidget()
+        self.staged_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.staged_list.itemClicked.connect(self._on_staged_select)
         self.unstage_btn = QPushButton("Unstage Selected")
         self.unstage_btn.clicked.connect(self._unstage_selected)
+        self.unstage_all_btn = QPushButton("Unstage All")
+        self.unstage_all_btn.clicked.connect(self._unstage_all)
+        s_btns = QHBoxLayout()
+        s_btns.addWidget(self.unstage_btn)
+        s_btns.addWidget(self.unstage_all_btn)
         s_layout.addWidget(self.staged_list)
-        s_layout.addWidget(self.unstage_btn)
+        s_layout.addLayout(s_btns)
         staged_group.setLayout(s_layout)
 
         left_layout.addLayout(top_bar)
@@ -68,9 +118,21 @@ class GitTab(QWidget):
         right_widget = QWidget()
         right_layout = QVBoxLayout(right_widget)
 
-        self.diff_view = QTextEdit()
-        self.diff_view.setReadOnly(True)
-        self.diff_view.setPlaceholderText("Select a file to view diff...")
+        self.diff_view = DiffView()
+        self.diff_view.set_diff("Select a file to view diff...")
+
+        # History: commits stream in as the list is scrolled
+        history_splitter = QSplitter(Qt.Vertical)
+        self.history_view = HistoryView()
+        self.history_view.selectionModel().currentChanged.connect(self._on_commit_selected)
+        self.commit_view = DiffView()
+        history_splitter.addWidget(self.history_view)
+        history_splitter.addWidget(self.commit_view)
+
+        self.view_tabs = QTabWidget()
+        self.view_tabs.addTab(self.diff_view, "Diff View")
+        self.view_tabs.addTab(history_splitter, "History")
+        self.view_tabs.currentChanged.connect(self._on_view_tab_changed)
 
         commit_group = QGroupBox("Commit")
         c_layout = QVBoxLayout()
@@ -86,17 +148,37 @@ class GitTab(QWidget):
         self.pull_btn = QPushButton("Pull")
         self.pull_btn.clicked.connect(self._pull)
         
+        # Build, stage the site changes, commit and push in one background run
+        self.publish_btn = QPushButton("Publish")
+        self.publish_btn.setToolTip("Build, then stage and commit the site changes (content/, data.json and build output; "
+                                    "message above or an automatic one) and push")
+        self.publish_btn.clicked.connect(self._publish)
+
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self._cancel_jobs)
+        
         btn_layout.addWidget(self.pull_btn)
         btn_layout.addWidget(self.commit_btn)
         btn_layout.addWidget(self.push_btn)
+        btn_layout.addWidget(self.publish_btn)
+        btn_layout.addWidget(self.cancel_btn)
         
         c_layout.addWidget(self.commit_msg)
         c_layout.addLayout(btn_layout)
         commit_group.setLayout(c_layout)
 
-        right_layout.addWidget(QLabel("Diff View"))
-        right_layout.addWidget(self.diff_view)
+        # Streamed output of commit/push/pull jobs
+        self.job_label = QLabel("Git Output")
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(2000)
+        self.log_view.setMaximumHeight(150)
+
+        right_layout.addWidget(self.view_tabs)
         right_layout.addWidget(commit_group)
+        right_layout.addWidget(self.job_label)
+        right_layout.addWidget(self.log_view)
 
         splitter.addWidget(left_widget)
         splitter.addWidget(right_widget)
@@ -107,76 +189,262 @@ class GitTab(QWidget):
         if not self.manager:
              QMessageBox.warning(self, "Error", "No repo path set.")
              return
-        ok, msg = self.manager.get_git_version()
+        ok, msg = self.manager.get_git_version(refresh=True)
         if ok:
              QMessageBox.information(self, "Git Found", f"Success! Found: {msg}")
         else:
              QMessageBox.critical(self, "Git Missing", f"Could not find git executable.\nError: {msg}")
 
     def _refresh_status(self):
+        # git status is run off the GUI thread; a newer refresh supersedes
+        # any still in flight
         if not self.manager: return
-        self.unstaged_list.clear()
-        self.staged_list.clear()
-        
-        staged, unstaged, err = self.manager.get_status()
-        
+        self._status_gen += 1
+        gen = self._status_gen
+        manager = self.manager
+        worker = Worker(manager.get_status, False)
+        worker.signals.finished.connect(lambda result: self._on_status_ready(gen, result))
+        worker.signals.error.connect(lambda msg: self._on_status_ready(gen, ([], [], msg)))
+        self._status_workers.add(worker)
+        worker.signals.finished.connect(lambda _: self._status_workers.discard(worker))
+        worker.signals.error.connect(lambda _: self._status_workers.discard(worker))
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_status_ready(self, gen, result):
+        if gen != self._status_gen: return
+        staged, unstaged, err = result
+
         if err:
-            self.diff_view.setPlainText(f"Git Error:\n{err}\n\nPlease check Settings path and ensure it's a git repo.")
+            self._staged, self._unstaged = [], []
+            self._by_label = {}
+            self.unstaged_list.clear()
+            self.staged_list.clear()
+            self.diff_view.set_diff(f"Git Error:\n{err}\n\nPlease check Settings path and ensure it's a git repo.")
             return
 
-        for item in unstaged:
-            self.unstaged_list.addItem(f"{item['status']} {item['path']}")
-        
-        for item in staged:
-            self.staged_list.addItem(f"{item['status']} {item['path']}")
+        # Cached diffs for files that are no longer changed can't be asked for again
+        self.manager.diff_cache.prune({item.path for item in staged + unstaged})
+
+        self._apply_delta(self.unstaged_list, self._unstaged, unstaged)
+        self._apply_delta(self.staged_list, self._staged, staged)
+        self._unstaged, self._staged = unstaged, staged
+        self._by_label = {
+            self.unstaged_list: {item.label(): item for item in unstaged},
+            self.staged_list: {item.label(): item for item in staged},
+        }
+
+    def _item_of(self, widget, row_item):
+        # Row text -> StatusItem; labels are unique within a list
+        return self._by_label[widget][row_item.text()]
+
+    def _apply_delta(self, widget, old, new):
+        # Only rows that changed since the last snapshot are touched, so
+        # selection and scroll position survive a refresh
+        removed, added = diff_items(old, new)
+        if not removed and not added:
+            return
+        widget.setUpdatesEnabled(False)
+        gone = {item.label() for item in removed}
+        for row in reversed(range(widget.count())):
+            if widget.item(row).text() in gone:
+                widget.takeItem(row)
+        # After the removals the widget holds exactly the rows that are in
+        # both snapshots, so a new item's index in `new` is its row
+        fresh = set(added)
+        for row, item in enumerate(new):
+            if item in fresh:
+                widget.insertItem(row, item.label())
+        widget.setUpdatesEnabled(True)
 
     def _on_unstaged_select(self, item):
-        path = item.text().split(' ', 1)[1]
-        diff = self.manager.get_diff(filepath=path, staged=False)
-        self.diff_view.setPlainText(diff)
+        self._show_diff(self._item_of(self.unstaged_list, item).path, staged=False)
 
     def _on_staged_select(self, item):
-        path = item.text().split(' ', 1)[1]
-        diff = self.manager.get_diff(filepath=path, staged=True)
-        self.diff_view.setPlainText(diff)
+        self._show_diff(self._item_of(self.staged_list, item).path, staged=True)
+
+    def _show_diff(self, path, staged):
+        # Big diffs take a while to produce; fetch off the GUI thread and
+        # only show the result for the most recent click
+        self._diff_gen += 1
+        gen = self._diff_gen
+        self.diff_view.set_diff(f"Loading diff for {path}...")
+        manager = self.manager
+        worker = Worker(lambda: (manager.get_diff(filepath=path, staged=staged) or "No changes.").split('\n'))
+        worker.signals.finished.connect(lambda diff: self._on_diff_ready(gen, diff))
+        worker.signals.error.connect(lambda msg: self._on_diff_ready(gen, [f"Diff failed: {msg}"]))
+        self._diff_workers.add(worker)
+        worker.signals.finished.connect(lambda _: self._diff_workers.discard(worker))
+        worker.signals.error.connect(lambda _: self._diff_workers.discard(worker))
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_diff_ready(self, gen, lines):
+        if gen != self._diff_gen: return
+        self.diff_view.set_lines(lines)
+
+    def _reload_history(self):
+        # Restart the log stream now if it's on screen, else on first view
+        self._history_stale = True
+        if self.view_tabs.currentIndex() == 1:
+            self._on_view_tab_changed(1)
+
+    def _on_view_tab_changed(self, index):
+        if index != 1 or not self._history_stale or not self.manager:
+            return
+        self._history_stale = False
+        self.commit_view.set_diff("Select a commit to view it...")
+        self.history_view.set_stream(self.manager.log_stream())
+
+    def _on_commit_selected(self, current, previous):
+        entry = self.history_view.entry_at(current.row())
+        if not entry: return
+        self._commit_gen += 1
+        gen = self._commit_gen
+        self.commit_view.set_diff(f"Loading {entry.short}...")
+        manager = self.manager
+        worker = Worker(lambda: manager.get_commit(entry.sha).split('\n'))
+        worker.signals.finished.connect(lambda lines: self._on_commit_ready(gen, lines))
+        worker.signals.error.connect(lambda msg: self._on_commit_ready(gen, [f"Show failed: {msg}"]))
+        self._diff_workers.add(worker)
+        worker.signals.finished.connect(lambda _: self._diff_workers.discard(worker))
+        worker.signals.error.connect(lambda _: self._diff_workers.discard(worker))
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_commit_ready(self, gen, lines):
+        if gen != self._commit_gen: return
+        self.commit_view.set_lines(lines)
+
+    def _selected_paths(self, widget):
+        paths = []
+        for row_item in widget.selectedItems():
+            item = self._item_of(widget, row_item)
+            paths.append(item.path)
+            # A rename is only fully (un)staged together with its source
+            if item.orig_path:
+                paths.append(item.orig_path)
+        return paths
 
     def _stage_selected(self):
-        item = self.unstaged_list.currentItem()
-        if not item: return
-        path = item.text().split(' ', 1)[1]
-        self.manager.stage_file(path)
-        self._refresh_status()
+        paths = self._selected_paths(self.unstaged_list)
+        if not paths: return
+        self._after_bulk(self.manager.stage_files(paths))
 
     def _unstage_selected(self):
-        item = self.staged_list.currentItem()
-        if not item: return
-        path = item.text().split(' ', 1)[1]
-        self.manager.unstage_file(path)
+        paths = self._selected_paths(self.staged_list)
+        if not paths: return
+        self._after_bulk(self.manager.unstage_files(paths))
+
+    def _stage_all(self):
+        if not self.manager: return
+        self._after_bulk(self.manager.stage_all())
+
+    def _unstage_all(self):
+        if not self.manager: return
+        self._after_bulk(self.manager.unstage_all())
+
+    def _after_bulk(self, result):
+        out, err = result
+        if err:
+            self._append_log(err, False)
         self._refresh_status()
 
     def _commit(self):
+        if not self.manager: return
         msg = self.commit_msg.toPlainText().strip()
         if not msg:
             QMessageBox.warning(self, "Error", "Commit message cannot be empty")
             return
-        out, err = self.manager.commit(msg)
-        if err:
-             QMessageBox.warning(self, "Commit Error", err)
-        else:
-             self.commit_msg.clear()
-             QMessageBox.information(self, "Success", "Committed successfully")
+        self.jobs.submit("Commit", self.manager.commit_args(msg), self._on_commit_done)
+
+    def _on_commit_done(self, exit_code, output):
+        if exit_code == 0:
+            self.commit_msg.clear()
         self._refresh_status()
 
     def _push(self):
-        QMessageBox.information(self, "Pushing", "Pushing to remote... check console if stuck.")
-        out, err = self.manager.push()
-        if err:
-            QMessageBox.warning(self, "Push Error", f"{out}\n{err}")
-        else:
-            QMessageBox.information(self, "Success", "Pushed successfully")
+        if not self.manager: return
+        self.jobs.submit("Push", self.manager.push_args())
 
     def _pull(self):
-        QMessageBox.information(self, "Pulling", "Pulling from remote...")
-        out, err = self.manager.pull()
+        if not self.manager: return
+        self.jobs.submit("Pull", self.manager.pull_args(), lambda code, out: self._refresh_status())
+
+    def _publish(self):
+        if not self.manager or self.publish_job or self.jobs.is_busy(): return
+        settings = SettingsManager()
+        message = self.commit_msg.toPlainText().strip() or None
+        self.publish_job = PublishJob(self.manager, message,
+                                      settings.get_build_stamp_path(self.repo_path),
+                                      settings.get_publish_log_path(), self)
+        self.publish_job.output.connect(self._append_log)
+        self.publish_job.stage_finished.connect(self._on_publish_stage)
+        self.publish_job.finished.connect(self._on_publish_done)
+        self._last_progress = False
+        self._append_log("Publishing...", False)
+        self.publish_job.start()
+        self._update_job_state()
+
+    def _on_publish_stage(self, result):
+        self._append_log(f"[{result.name}] {result.outcome} in {result.seconds:.2f}s"
+                         + (f" - {result.detail}" if result.detail else ""), False)
+
+    def _on_publish_done(self, results):
+        self.publish_job.deleteLater()
+        self.publish_job = None
+        total = sum(r.seconds for r in results)
+        timings = ", ".join(f"{r.name} {r.seconds:.2f}s" for r in results if r.outcome != SKIPPED)
+        failed = [r for r in results if r.outcome == FAILED]
+        summary = f"Publish {'failed' if failed else 'finished'} in {total:.2f}s"
+        self._append_log(f"{summary} ({timings or 'nothing to do'})", False)
+        if not failed and any(r.name == 'commit' and r.outcome == DONE for r in results):
+            self.commit_msg.clear()
+        self._update_job_state()
         self._refresh_status()
-        QMessageBox.information(self, "Git Output", f"{out}\n{err}")
+        self._reload_history()
+
+    def _cancel_jobs(self):
+        if self.publish_job:
+            self.publish_job.cancel()
+        if self.jobs:
+            self.jobs.cancel()
+
+    def _append_log(self, line, progress):
+        # Progress updates ("Writing objects: 42%") overwrite each other and
+        # are replaced by git's final "..., done." line
+        if self._last_progress:
+            cursor = self.log_view.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.select(QTextCursor.BlockUnderCursor)
+            cursor.removeSelectedText()
+        self.log_view.appendPlainText(line)
+        self._last_progress = progress
+
+    def _on_job_started(self, label):
+        self._last_progress = False
+        self._update_job_state()
+
+    def _on_job_finished(self, label, exit_code, output):
+        if exit_code == 0:
+            self._append_log(f"{label} finished.", False)
+            # Commits and pulls move HEAD
+            self._reload_history()
+        elif exit_code > 0:
+            self._append_log(f"{label} failed (exit code {exit_code}).", False)
+        self._update_job_state()
+
+    def _update_job_state(self, queued=None):
+        busy = bool(self.jobs and self.jobs.is_busy())
+        waiting = len(self.jobs.queue) if self.jobs else 0
+        publishing = self.publish_job is not None
+        self.cancel_btn.setEnabled(busy or publishing)
+        self.publish_btn.setEnabled(not busy and not publishing)
+        for btn in (self.commit_btn, self.push_btn, self.pull_btn):
+            btn.setEnabled(not publishing)
+        if publishing:
+            text = "Git Output - publishing"
+        elif busy:
+            text = f"Git Output - running {self.jobs.current[0]}"
+            if waiting:
+                text += f" ({waiting} queued)"
+        else:
+            text = "Git Output"
+        self.job_label.setText(text)
@@ -0,0 +1,97 @@
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QThreadPool
+from utils.workers import Worker
+
+# Commits read from git per fetchMore()
+PAGE_SIZE = 200
+
+
+class HistoryModel(QAbstractListModel):
+    EntryRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+        self._stream = None
+        self._pending = None
+        self._workers = set()
+
+    def set_stream(self, stream):
+        # Takes ownership of a GitLogStream (or None to empty the view)
+        self.beginResetModel()
+        if self._stream:
+            self._stream.close()
+        self._stream = stream
+        self._entries = []
+        self._pending = None
+        self.endResetModel()
+
+    def entry_at(self, row):
+        if 0 <= row < len(self._entries):
+            return self._entries[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._stream:
+            return False
+        return not self._stream.done and self._pending is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        # Pages are read on the pool: a path-limited log may walk a lot of
+        # history before it finds the next match
+        if not self.canFetchMore(parent):
+            return
+        stream = self._stream
+        self._pending = stream
+        worker = Worker(stream.read, PAGE_SIZE)
+        worker.signals.finished.connect(lambda entries: self._on_page(stream, entries))
+        worker.signals.error.connect(lambda msg: self._on_page(stream, []))
+        self._workers.add(worker)
+        worker.signals.finished.connect(lambda _: self._workers.discard(worker))
+        worker.signals.error.connect(lambda _: self._workers.discard(worker))
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_page(self, stream, entries):
+        if stream is not self._stream:
+            return
+        self._pending = None
+        if entries:
+            start = len(self._entries)
+            self.beginInsertRows(QModelIndex(), start, start + len(entries) - 1)
+            self._entries.extend(entries)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.label()
+        if role == Qt.ToolTipRole:
+            return f"{entry.sha}\n{entry.author}, {entry.date}\n\n{entry.subject}"
+        if role == self.EntryRole:
+            return entry
+        return None
+
+
+# Commit list that pulls `git log` a page at a time as it is scrolled
+class HistoryView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.history_model = HistoryModel(self)
+        self.setModel(self.history_model)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+
+    def set_stream(self, stream):
+        self.history_model.set_stream(stream)
+        # Views only ask for more once something is shown; prime the first page
+        self.history_model.fetchMore()
+
+    def entry_at(self, row):
+        return self.history_model.entry_at(row)
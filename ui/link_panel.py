@@ -0,0 +1,68 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QCheckBox, QTreeWidget, QTreeWidgetItem)
+from PySide6.QtCore import Signal
+
+COLUMNS = ("Source", "Line", "Target", "Problem")
+
+
+# Results of a LinkChecker run, one row per broken reference.
+# Double-clicking a row asks for the source to be opened at that line.
+class LinkPanel(QWidget):
+    check_requested = Signal(bool)      # check external URLs too
+    open_requested = Signal(str, object)  # source, line (int) or JSON path
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._issues = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        top = QHBoxLayout()
+        self.status_label = QLabel("Link Check")
+        self.external_box = QCheckBox("External URLs")
+        self.external_box.setToolTip("Also request every http(s) link (slower, needs network)")
+        self.check_btn = QPushButton("Check Links")
+        self.check_btn.clicked.connect(lambda: self.check_requested.emit(self.external_box.isChecked()))
+        top.addWidget(self.status_label)
+        top.addStretch()
+        top.addWidget(self.external_box)
+        top.addWidget(self.check_btn)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.itemDoubleClicked.connect(self._on_double_clicked)
+
+        layout.addLayout(top)
+        layout.addWidget(self.tree)
+
+    def check_started(self):
+        self.check_btn.setEnabled(False)
+        self.status_label.setText("Checking links...")
+
+    def check_failed(self, message):
+        self.check_btn.setEnabled(True)
+        self.status_label.setText(f"Link check failed: {message}")
+
+    def show_report(self, report):
+        self.check_btn.setEnabled(True)
+        external = f", {report.external} external URL(s)" if report.external else ""
+        self.status_label.setText(
+            f"{len(report.issues)} problem(s) in {report.links} link(s) across "
+            f"{report.sources} file(s){external} in {report.seconds:.2f}s")
+        # Rows map to issues by position, so no per-item data is stored
+        self._issues = report.issues
+        self.tree.clear()
+        self.tree.addTopLevelItems([
+            QTreeWidgetItem([issue.ref.source, str(issue.ref.line), issue.ref.target,
+                             f"{issue.status}: {issue.detail}" if issue.detail else issue.status])
+            for issue in report.issues])
+        for column in range(len(COLUMNS) - 1):
+            self.tree.resizeColumnToContents(column)
+
+    def _on_double_clicked(self, item, column):
+        row = self.tree.indexOfTopLevelItem(item)
+        if 0 <= row < len(self._issues):
+            ref = self._issues[row].ref
+            self.open_requested.emit(ref.source, ref.line)
@@ -1,9 +1,12 @@
 from PySide6.QtWidgets import QMainWindow, QTabWidget, QWidget, QVBoxLayout, QMessageBox, QFileDialog, QLabel, QLineEdit, QPushButton, QHBoxLayout
+from PySide6.QtCore import QTimer, QThreadPool
+from models.git_manager import GitManager
 from ui.posts_tab import PostsTab
 from ui.git_tab import GitTab
 from ui.profile_tab import ProfileTab
 from utils.settings import SettingsManager
 from utils.theme import apply_dark_theme 
+from utils.workers import Worker
 import os
 
 class MainWindow(QMainWindow):
@@ -34,6 +37,17 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.git_tab, "Git Version Control")
         self.tabs.addTab(self.settings_tab, "Settings")
         
+        # "Uncommitted" badge; checked from .git/index, so polling is cheap
+        self.dirty_label = QLabel()
+        self.statusBar().addPermanentWidget(self.dirty_label)
+        self.dirty_manager = GitManager(self.repo_path) if self.repo_path else None
+        self._dirty_worker = None
+        self.dirty_timer = QTimer(self)
+        self.dirty_timer.setInterval(2000)
+        self.dirty_timer.timeout.connect(self._check_dirty)
+        self.dirty_timer.start()
+        self._check_dirty()
+
         if not self.repo_path:
             QMessageBox.warning(self, "Setup Required", "Please select your website repository path in Settings.")
             self.tabs.setCurrentIndex(3)
@@ -66,3 +80,33 @@ class MainWindow(QMainWindow):
             self.profile_tab.set_repo_path(path)
             self.posts_tab.set_repo_path(path)
             self.git_tab.set_repo_path(path)
+            if self.dirty_manager:
+                self.dirty_manager.close()
+            self.dirty_manager = GitManager(path)
+            self._check_dirty()
+
+    def _check_dirty(self):
+        # One check in flight at a time; a fallback git status may take a moment
+        if not self.dirty_manager or self._dirty_worker:
+            return
+        manager = self.dirty_manager
+        worker = Worker(manager.check_dirty)
+        worker.signals.finished.connect(lambda result: self._on_dirty_checked(manager, result))
+        worker.signals.error.connect(lambda msg: self._on_dirty_checked(manager, (None, [])))
+        self._dirty_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_dirty_checked(self, manager, result):
+        self._dirty_worker = None
+        if manager is not self.dirty_manager:
+            return
+        dirty, paths = result
+        if dirty is None:
+            self.dirty_label.setText("")
+            self.dirty_label.setToolTip("")
+        elif dirty:
+            self.dirty_label.setText(f"● {len(paths)} uncommitted")
+            self.dirty_label.setToolTip("\n".join(paths[:50]))
+        else:
+            self.dirty_label.setText("✓ Committed")
+            self.dirty_label.setToolTip("")
@@ -0,0 +1,180 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# Rows handed to the view per fetchMore(); the view asks for more as the
+# user scrolls, so 50k posts never materialize 50k rows up front
+FETCH_BATCH = 500
+
+SORT_DATE = 'date'
+SORT_TITLE = 'title'
+
+
+class PostListModel(QAbstractListModel):
+    PostRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._all = []          # every post, in sort order
+        self._posts = self._all # rows on display: _all, or ranked search hits
+        self._filtered = False
+        self._loaded = 0
+        self._sort_field = SORT_DATE
+        self._descending = True
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        post = self._posts[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{post.title} ({post.filename})"
+        if role == Qt.ToolTipRole:
+            return post.path
+        if role == self.PostRole:
+            return post
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._posts)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self._posts) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def sort(self, column=0, order=Qt.DescendingOrder):
+        self.sort_by(self._sort_field, order == Qt.DescendingOrder)
+
+    # --- Post access ---
+
+    def set_posts(self, posts):
+        self.beginResetModel()
+        self._all = sorted(posts, key=self._key, reverse=self._descending)
+        self._posts = self._all
+        self._filtered = False
+        self._loaded = min(FETCH_BATCH, len(self._posts))
+        self.endResetModel()
+
+    def set_filter(self, filenames):
+        # Show only the given posts in the given (ranked) order; None shows all
+        self.beginResetModel()
+        if filenames is None:
+            self._posts = self._all
+            self._filtered = False
+        else:
+            by_name = {post.filename: post for post in self._all}
+            self._posts = [by_name[f] for f in filenames if f in by_name]
+            self._filtered = True
+        self._loaded = min(FETCH_BATCH, len(self._posts))
+        self.endResetModel()
+
+    def is_filtered(self):
+        return self._filtered
+
+    def post_at(self, row):
+        if 0 <= row < self._loaded:
+            return self._posts[row]
+        return None
+
+    def row_of(self, filename):
+        # Makes the row visible to the view if it sits past the fetched range
+        for row, post in enumerate(self._posts):
+            if post.filename == filename:
+                if row >= self._loaded:
+                    self.beginInsertRows(QModelIndex(), self._loaded, row)
+                    self._loaded = row + 1
+                    self.endInsertRows()
+                return row
+        return -1
+
+    def sort_by(self, field, descending):
+        if field == self._sort_field and descending == self._descending:
+            return
+        self._sort_field = field
+        self._descending = descending
+        if self._filtered:
+            # Search hits keep their rank order on display
+            self._all.sort(key=self._key, reverse=descending)
+            return
+        ordered = sorted(self._posts, key=self._key, reverse=descending)
+        rows = {id(post): row for row, post in enumerate(ordered)}
+
+        # Selected posts must stay reachable even if they sort past the
+        # fetched range, so grow it before the layout change
+        needed = max((rows[id(self._posts[i.row()])] + 1 for i in self.persistentIndexList()),
+                     default=0)
+        if needed > self._loaded:
+            self.beginInsertRows(QModelIndex(), self._loaded, needed - 1)
+            self._loaded = needed
+            self.endInsertRows()
+
+        self.layoutAboutToBeChanged.emit()
+        old_persistent = self.persistentIndexList()
+        new_persistent = [self.index(rows[id(self._posts[i.row()])], 0) for i in old_persistent]
+        self._posts = self._all = ordered
+        self.changePersistentIndexList(old_persistent, new_persistent)
+        self.layoutChanged.emit()
+
+    def apply_changes(self, changed, removed):
+        # Row-level updates for a (changed records, removed filenames) delta.
+        # While filtered only the backing list is updated; the caller re-runs
+        # its search to refresh the visible rows.
+        gone = set(removed) | {p.filename for p in changed}
+        if self._filtered:
+            self._all = [p for p in self._all if p.filename not in gone]
+            for post in changed:
+                self._all.insert(self._insert_pos(post, self._all), post)
+            return
+
+        for row in reversed(range(len(self._posts))):
+            if self._posts[row].filename not in gone:
+                continue
+            if row < self._loaded:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._posts[row]
+                self._loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self._posts[row]
+
+        for post in changed:
+            row = self._insert_pos(post, self._posts)
+            if row <= self._loaded:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._posts.insert(row, post)
+                self._loaded += 1
+                self.endInsertRows()
+            else:
+                self._posts.insert(row, post)
+
+    # --- Sorting helpers ---
+
+    def _key(self, post):
+        if self._sort_field == SORT_TITLE:
+            return (post.title.lower(), post.filename)
+        return (post.sort_date, post.filename)
+
+    def _insert_pos(self, post, posts):
+        key = self._key(post)
+        lo, hi = 0, len(posts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self._key(posts[mid])
+            before = other > key if self._descending else other < key
+            if before:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
@@ -1,26 +1,84 @@
-from PySide6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QListWidget, 
-                                 QLineEdit, QTextEdit, QPushButton, QLabel, QSplitter, 
-                                 QMessageBox, QInputDialog, QFileDialog, QTextBrowser)
-from PySide6.QtCore import Qt, QProcess, QTimer
+from PySide6.QtWidgets import (QApplication, QWidget, QHBoxLayout, QVBoxLayout, QListView, QComboBox,
+                                 QLineEdit, QPlainTextEdit, QPushButton, QLabel, QSplitter, 
+                                 QMessageBox, QInputDialog, QFileDialog, QTextBrowser, QTabWidget)
+from PySide6.QtCore import Qt, QTimer, QModelIndex, QThreadPool, QUrl
+from PySide6.QtGui import QTextDocument, QTextCursor, QDesktopServices
 from models.post_manager import PostManager
-import markdown
+from models.git_manager import GitManager
+from models.site_builder import SiteBuilder, post_header
+from models.preview_server import PREVIEW_PATH
+from models.frontmatter import split_document
+from models.render_cache import RenderCache
+from models.image_store import ImageStore
+from models.link_checker import LinkChecker, HttpChecker
+from models.preview_renderer import BlockRenderer
+from models.highlight import style_css
+from ui.post_list_model import PostListModel, SORT_DATE, SORT_TITLE
+from ui.history_view import HistoryView
+from ui.build_console import BuildConsole
+from ui.link_panel import LinkPanel
+from utils.settings import SettingsManager
+from utils.post_watcher import PostWatcher
+from utils.workers import Worker
+from utils.build_runner import BuildRunner
+from utils.preview_host import PreviewHost
 import os
+import time
 
 class PostsTab(QWidget):
     def __init__(self, repo_path):
         super().__init__()
         self.repo_path = repo_path
         self.manager = None
+        self.git = None
+        self.site_builder = None
+        self.image_store = None
+        self.link_checker = None
+        self._link_worker = None
+        self._site_worker = None
+        self._site_queued = False
+        self.build_runner = None
         self.current_file = None
-        
-        self._init_ui()
-        if repo_path:
-            self.set_repo_path(repo_path)
+        self._syncing_list = False
+        self._index_worker = None
+        # Preview rendering: one thread, so the renderer's Markdown instance
+        # is never used concurrently
+        # Rendered bodies persist across sessions and are shared with the
+        # post preview pages (same keys), so a rendered post previews from cache
+        self.render_cache = RenderCache(SettingsManager().get_render_cache_path())
+        self.renderer = BlockRenderer(store=self.render_cache)
+        self.preview_pool = QThreadPool(self)
+        self.preview_pool.setMaxThreadCount(1)
+        self._preview_gen = 0
+        self._preview_workers = set()
+        self._styles = {}
 
-        # Debounce preview updates
-        self.timer = QTimer()
+        # Debounce preview updates (300ms)
+        self.timer = QTimer(self)
         self.timer.setSingleShot(True)
+        self.timer.setInterval(300)
         self.timer.timeout.connect(self._update_preview)
+        QApplication.instance().aboutToQuit.connect(self._stop_preview)
+
+        # Pick up external edits (git pull, other editors) incrementally
+        self.watcher = PostWatcher(self)
+        self.watcher.changed.connect(self._apply_disk_changes)
+
+        # Local HTTP preview of the site; saves re-render post previews and
+        # reload them, a build script run reloads every page
+        self.preview_host = PreviewHost(self)
+        self.preview_host.rebuilt.connect(self._on_preview_rebuilt)
+        self.preview_host.error.connect(lambda msg: self.build_console.append(f"Preview build error: {msg}"))
+        QApplication.instance().aboutToQuit.connect(self.preview_host.stop)
+
+        self._init_ui()
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self._run_search)
+
+        if repo_path:
+            self.set_repo_path(repo_path)
 
     def _init_ui(self):
         layout = QHBoxLayout()
@@ -35,17 +93,60 @@ class PostsTab(QWidget):
         self.refresh_btn = QPushButton("Refresh List")
         self.refresh_btn.clicked.connect(self._refresh_list)
         
-        self.post_list = QListWidget()
-        self.post_list.currentItemChanged.connect(self._on_post_selected)
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search posts...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(lambda: self.search_timer.start(150))
+
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItem("Newest first", (SORT_DATE, True))
+        self.sort_combo.addItem("Oldest first", (SORT_DATE, False))
+        self.sort_combo.addItem("Title A-Z", (SORT_TITLE, False))
+        self.sort_combo.addItem("Title Z-A", (SORT_TITLE, True))
+        self.sort_combo.currentIndexChanged.connect(self._on_sort_changed)
+
+        # Model/view list: rows are fetched lazily and never become widgets
+        self.post_model = PostListModel(self)
+        self.post_list = QListView()
+        self.post_list.setUniformItemSizes(True)
+        self.post_list.setModel(self.post_model)
+        self.post_list.selectionModel().currentChanged.connect(self._on_post_selected)
         
+        # Preview pages of every post in the CMS cache (see SiteBuilder);
+        # the published site comes from the build script above
+        self.site_btn = QPushButton("Render Post Previews")
+        self.site_btn.setToolTip("Render each post as a standalone preview page. "
+                                 "This does not build the site; use Run Build Script for that.")
+        self.site_btn.clicked.connect(self._build_site)
+        self.build_status = QLabel("")
+        self.cache_label = QLabel("")
+        self.serve_btn = QPushButton("Start Preview Server")
+        self.serve_btn.clicked.connect(self._toggle_server)
+        self.serve_label = QLabel("")
+        self.serve_label.setOpenExternalLinks(True)
+
+        # Revisions of the selected post; picking one previews it
+        self.history_view = HistoryView()
+        self.history_view.setMaximumHeight(160)
+        self.history_view.selectionModel().currentChanged.connect(self._on_revision_selected)
+
         self.build_btn = QPushButton("Run Build Script")
         self.build_btn.clicked.connect(self._run_build)
         self.build_btn.setStyleSheet("background-color: #2a82da; font-weight: bold;")
         
         left_layout.addWidget(self.new_btn)
         left_layout.addWidget(self.refresh_btn)
+        left_layout.addWidget(self.search_box)
+        left_layout.addWidget(self.sort_combo)
         left_layout.addWidget(self.post_list)
+        left_layout.addWidget(QLabel("History"))
+        left_layout.addWidget(self.history_view)
         left_layout.addWidget(self.build_btn)
+        left_layout.addWidget(self.site_btn)
+        left_layout.addWidget(self.build_status)
+        left_layout.addWidget(self.cache_label)
+        left_layout.addWidget(self.serve_btn)
+        left_layout.addWidget(self.serve_label)
         
         # Right Pane: Editor & Preview
         right_splitter = QSplitter(Qt.Vertical)
@@ -66,9 +167,11 @@ class PostsTab(QWidget):
         editor_toolbar.addWidget(self.img_btn)
         editor_toolbar.addWidget(self.save_btn)
         
-        self.editor = QTextEdit()
+        self.editor = QPlainTextEdit()
         self.editor.setPlaceholderText("Select a post to edit...")
-        self.editor.textChanged.connect(self._on_text_changed)
+        # Straight to the C++ slot: keystrokes never wait on the GIL while
+        # the preview thread is busy
+        self.editor.textChanged.connect(self.timer.start)
         
         editor_layout.addLayout(editor_toolbar)
         editor_layout.addWidget(self.editor)
@@ -76,16 +179,29 @@ class PostsTab(QWidget):
         # Preview Pane
         preview_widget = QWidget()
         preview_layout = QVBoxLayout(preview_widget)
-        preview_layout.addWidget(QLabel("Live Preview"))
+        self.preview_label = QLabel("Live Preview")
+        preview_layout.addWidget(self.preview_label)
         
         self.preview = QTextBrowser()
         self.preview.setOpenExternalLinks(True)
         preview_layout.addWidget(self.preview)
         
+        # Build output, last result and recent durations
+        self.build_console = BuildConsole(SettingsManager().get_build_log_path())
+        # Broken links and images across all posts and data.json
+        self.link_panel = LinkPanel()
+        self.link_panel.check_requested.connect(self._check_links)
+        self.link_panel.open_requested.connect(self._open_link_source)
+        self.bottom_tabs = QTabWidget()
+        self.bottom_tabs.addTab(self.build_console, "Build Output")
+        self.bottom_tabs.addTab(self.link_panel, "Link Check")
+
         right_splitter.addWidget(editor_widget)
         right_splitter.addWidget(preview_widget)
+        right_splitter.addWidget(self.bottom_tabs)
         right_splitter.setStretchFactor(0, 1)
         right_splitter.setStretchFactor(1, 1)
+        right_splitter.setStretchFactor(2, 0)
         
         splitter.addWidget(left_widget)
         splitter.addWidget(right_splitter)
@@ -96,36 +212,268 @@ class PostsTab(QWidget):
 
     def set_repo_path(self, path):
         self.repo_path = path
-        self.manager = PostManager(path)
+        self.manager = PostManager(path, SettingsManager().get_index_path(path))
+        self.manager.on_save = self.preview_host.source_saved
+        self.image_store = ImageStore(path, SettingsManager().get_image_index_path(path))
+        self.link_checker = LinkChecker(self.manager)
+        if self.git:
+            self.git.close()
+        self.git = GitManager(path)
+        self.history_view.set_stream(None)
+        self.site_builder = SiteBuilder(self.manager, SettingsManager().get_site_dir(path),
+                                        BlockRenderer(store=self.render_cache))
+        if self.build_runner:
+            self.build_runner.cancel()
+            self.build_runner.deleteLater()
+        self.build_runner = BuildRunner(path, self)
+        self.build_runner.output.connect(self.build_console.append)
+        self.build_runner.started.connect(lambda: self.build_console.build_started("Build script"))
+        self.build_runner.finished.connect(self._on_build_finished)
+        if self.preview_host.is_running():
+            self._start_server()
         self._refresh_list()
+        self.watcher.watch(self.manager.posts_dir)
 
     def _refresh_list(self):
         if not self.manager: return
-        self.post_list.clear()
         posts = self.manager.get_posts()
-        for p in posts:
-            self.post_list.addItem(f"{p['title']} ({p['filename']})")
-        self.posts_data = posts
+        self._syncing_list = True
+        self.post_model.set_posts(posts)
+        self._select_current()
+        self._syncing_list = False
+        self._build_search_index(posts)
+        if self.search_box.text().strip():
+            self._run_search()
+
+    def _build_search_index(self, posts):
+        # Reads post bodies, so keep it off the GUI thread. Search works on
+        # whatever has been indexed so far and is re-run once it completes.
+        if self._index_worker: return
+        self._index_worker = Worker(self.manager.build_search_index, posts)
+        self._index_worker.manager = self.manager
+        self._index_worker.signals.finished.connect(self._on_search_index_built)
+        self._index_worker.signals.error.connect(self._on_search_index_built)
+        QThreadPool.globalInstance().start(self._index_worker)
+
+    def _on_search_index_built(self, result=None):
+        stale = self._index_worker.manager is not self.manager
+        self._index_worker = None
+        if stale:
+            # Repo was switched while indexing the previous one
+            self._build_search_index(self.manager.get_posts())
+        elif self.search_box.text().strip():
+            self._run_search()
+
+    def _run_search(self):
+        if not self.manager: return
+        query = self.search_box.text().strip()
+        self._syncing_list = True
+        self.post_model.set_filter(self.manager.search(query) if query else None)
+        self._select_current()
+        self._syncing_list = False
+
+    def _apply_disk_changes(self):
+        if not self.manager: return
+        changed, removed = self.manager.get_changes()
+        if not changed and not removed: return
+
+        # Rows move around below; keep the editor on the same post and don't
+        # let a selection change reload (and discard) what is being edited
+        self._syncing_list = True
+        self.post_model.apply_changes(changed, removed)
+        self._select_current()
+        self._syncing_list = False
+        if self.post_model.is_filtered():
+            self._run_search()
+
+        if self.current_file in removed:
+            self._open_post_deleted()
+        elif any(post.filename == self.current_file for post in changed):
+            self._open_post_changed()
+
+    def _open_post_changed(self):
+        # The open post changed on disk (pull, another editor, or our own
+        # save coming back through the watcher)
+        try:
+            content = self.manager.load_post(self.current_file)
+        except OSError:
+            return
+        if content == self.editor.toPlainText():
+            return
+        if self.editor.document().isModified():
+            answer = QMessageBox.question(
+                self, "Post Changed on Disk",
+                f"{self.current_file} was changed outside the editor.\n\n"
+                "Reload it and discard your unsaved edits?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if answer != QMessageBox.Yes:
+                return
+        self._reload_editor(content)
+
+    def _open_post_deleted(self):
+        answer = QMessageBox.question(
+            self, "Post Deleted on Disk",
+            f"{self.current_file} was deleted outside the editor.\n\n"
+            "Keep it open? Saving will recreate the file.",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if answer == QMessageBox.Yes:
+            # Whatever is in the editor is no longer on disk
+            self.editor.document().setModified(True)
+            return
+        self.current_file = None
+        self.editor.blockSignals(True)
+        self.editor.clear()
+        self.editor.blockSignals(False)
+        self.history_view.set_stream(None)
+        self._update_preview()
+
+    def _reload_editor(self, content):
+        # Replace the editor text, keeping the cursor and scroll roughly put
+        position = self.editor.textCursor().position()
+        scroll = self.editor.verticalScrollBar().value()
+        self.editor.blockSignals(True)
+        self.editor.setPlainText(content)
+        self.editor.blockSignals(False)
+        cursor = self.editor.textCursor()
+        cursor.setPosition(min(position, len(content)))
+        self.editor.setTextCursor(cursor)
+        self.editor.verticalScrollBar().setValue(scroll)
+        self._update_preview()
+
+    def _on_sort_changed(self):
+        field, descending = self.sort_combo.currentData()
+        self.post_model.sort_by(field, descending)
+        current = self.post_list.currentIndex()
+        if current.isValid():
+            self.post_list.scrollTo(current)
+
+    def _select_current(self):
+        row = self.post_model.row_of(self.current_file) if self.current_file else -1
+        if row < 0:
+            self.post_list.setCurrentIndex(QModelIndex())
+            return
+        index = self.post_model.index(row, 0)
+        self.post_list.setCurrentIndex(index)
+        self.post_list.scrollTo(index)
 
     def _on_post_selected(self, current, previous):
-        if not current: return
-        row = self.post_list.row(current)
-        post = self.posts_data[row]
-        self.current_file = post['filename']
+        if self._syncing_list or not current.isValid(): return
+        post = self.post_model.post_at(current.row())
+        if not post: return
+        try:
+            # Bodies are not kept in the listing; read on demand
+            content = self.manager.load_post(post.filename)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, "Error", f"Could not open post: {e}")
+            # The editor still holds the previous post; keep the list on it
+            # so Save can't write that text over the post that failed
+            self._syncing_list = True
+            self._select_current()
+            self._syncing_list = False
+            return
+        self.current_file = post.filename
         self.editor.blockSignals(True)
-        self.editor.setPlainText(post['content'])
+        self.editor.setPlainText(content)
         self.editor.blockSignals(False)
+        # A different post starts at the top
+        self.preview.verticalScrollBar().setValue(0)
         self._update_preview()
+        rel = os.path.relpath(os.path.join(self.manager.posts_dir, post.filename), self.repo_path)
+        self.history_view.set_stream(self.git.log_stream(rel.replace(os.sep, '/')))
 
-    def _on_text_changed(self):
-        # Debounce preview update (300ms)
-        self.timer.start(300)
+    def _on_revision_selected(self, current, previous):
+        entry = self.history_view.entry_at(current.row())
+        if not entry or not self.current_file: return
+        rel = os.path.relpath(os.path.join(self.manager.posts_dir, self.current_file), self.repo_path)
+        # Served from the blob LRU after the first look
+        text = self.git.read_revision(entry.sha, rel.replace(os.sep, '/'))
+        if text is None:
+            self.preview_label.setText(f"Revision {entry.short}: not readable")
+            return
+        self.preview.verticalScrollBar().setValue(0)
+        self._update_preview(text)
+        self.preview_label.setText(f"Revision {entry.short} ({entry.date}) - edit to return to live preview")
 
-    def _update_preview(self):
-        text = self.editor.toPlainText()
-        # Convert MD to HTML with extensions
-        html = markdown.markdown(text, extensions=['fenced_code', 'tables'])
-        
+    def _update_preview(self, text=None):
+        # Rendering runs on a dedicated thread; each request gets a new
+        # generation number and anything older is dropped unapplied.
+        # text is an old revision to show instead of the editor contents.
+        self._preview_gen += 1
+        # Unsaved drafts are rendered but not added to the render cache
+        persist = True
+        if text is None:
+            text = self.editor.toPlainText()
+            persist = not self.editor.document().isModified()
+            self.preview_label.setText("Live Preview")
+        worker = Worker(self._render_preview, text,
+                        self._preview_style(), self.preview.font(), self._preview_gen, persist)
+        worker.signals.finished.connect(self._apply_preview)
+        worker.signals.error.connect(lambda msg: print(f"Preview error: {msg}"))
+        self._preview_workers.add(worker)
+        worker.signals.finished.connect(lambda _: self._preview_workers.discard(worker))
+        worker.signals.error.connect(lambda _: self._preview_workers.discard(worker))
+        self.preview_pool.start(worker)
+
+    def _render_preview(self, text, style, font, gen, persist=True):
+        # Preview thread. Superseded requests bail out before doing work.
+        if gen != self._preview_gen:
+            return None
+        # Heading from the frontmatter as the site shows it; the body comes
+        # from the render cache or is converted block by block
+        meta, body = split_document(text)
+        _, header = post_header(meta, self.current_file or '')
+        html = header + self.renderer.render(body, persist)
+        if gen != self._preview_gen:
+            return None
+        # Parsing HTML into a QTextDocument is the expensive half of setHtml,
+        # so do it here and only swap the finished document in on the GUI thread
+        doc = QTextDocument()
+        doc.setDefaultFont(font)
+        doc.setHtml(style + html)
+        doc.moveToThread(QApplication.instance().thread())
+        return gen, doc
+
+    def _apply_preview(self, result):
+        if result is None: return
+        gen, doc = result
+        if gen != self._preview_gen:
+            doc.deleteLater()
+            return
+        # Swapping documents resets the scroll position; keep the reader where they were
+        scrollbar = self.preview.verticalScrollBar()
+        pos = scrollbar.value()
+        old = self.preview.document()
+        # The initial document belongs to the browser and goes away with
+        # setDocument(); the ones we installed are ours to release
+        owned = old.parent() is self.preview
+        doc.setParent(self.preview)
+        self.preview.setDocument(doc)
+        if owned:
+            old.deleteLater()
+        scrollbar.setValue(min(pos, scrollbar.maximum()))
+        self._update_cache_stats()
+
+    def _stop_preview(self):
+        # Let queued renders bail out and finish the running one before Qt
+        # tears down the objects it reports to
+        self._preview_gen += 1
+        self.preview_pool.clear()
+        self.preview_pool.waitForDone()
+
+    def _update_cache_stats(self):
+        stats = self.render_cache.stats()
+        self.cache_label.setText(
+            f"Render cache: {stats['entries']} entries, {stats['bytes'] / 2**20:.1f}/"
+            f"{stats['max_bytes'] / 2**20:.0f} MB, {stats['hit_rate']:.0%} hits "
+            f"({stats['hits']}/{stats['hits'] + stats['misses']})")
+
+    def _preview_style(self):
+        dark = bool(self.parent() and "Dark" in str(self.parent())) # simplistic check
+        if dark not in self._styles:
+            self._styles[dark] = self._build_preview_style(dark)
+        return self._styles[dark]
+
+    def _build_preview_style(self, dark):
         # Basic CSS to mimic site roughly
         style = """
         <style>
@@ -138,7 +486,7 @@ class PostsTab(QWidget):
         </style>
         """
         # Dark mode adjust for preview if needed, but white paper look is often better for preview
-        if self.parent() and "Dark" in str(self.parent()): # simplistic check
+        if dark:
              style = """
             <style>
                 body { font-family: sans-serif; color: #e0e0e0; background-color: #1e1e1e; line-height: 1.6; }
@@ -149,13 +497,14 @@ class PostsTab(QWidget):
                 img { max-width: 100%; border-radius: 5px; }
             </style>
             """
-            
-        self.preview.setHtml(style + html)
+        # Pygments token colours for highlighted fenced code
+        return style + f"<style>{style_css('monokai' if dark else 'default')}</style>"
 
     def _save_current(self):
         if not self.current_file or not self.manager: return
         content = self.editor.toPlainText()
         self.manager.save_post(self.current_file, content)
+        self.editor.document().setModified(False)
         # Show mini status msg instead of popup?
         self.save_btn.setText("Saved!")
         QTimer.singleShot(2000, lambda: self.save_btn.setText("Save (Ctrl+S)"))
@@ -165,38 +514,154 @@ class PostsTab(QWidget):
         title, ok = QInputDialog.getText(self, "New Post", "Enter post title:")
         if ok and title:
             filename = self.manager.create_post(title)
-            self._refresh_list()
+            self._apply_disk_changes()
             # Select the new item
-            items = self.post_list.findItems(f"{title} ({filename})", Qt.MatchContains)
-            if items:
-                self.post_list.setCurrentItem(items[0])
+            row = self.post_model.row_of(filename)
+            if row >= 0:
+                index = self.post_model.index(row, 0)
+                self.post_list.setCurrentIndex(index)
+                self.post_list.scrollTo(index)
 
     def _insert_image(self):
-        if not self.repo_path: return
-        img_dir = os.path.join(self.repo_path, 'content', 'images')
-        if not os.path.exists(img_dir):
-            os.makedirs(img_dir)
-            
-        path, _ = QFileDialog.getOpenFileName(self, "Select Image", img_dir, "Images (*.png *.jpg *.jpeg *.gif *.webp)")
-        if path:
-            # Copy if not in repo? Or just ref.
-            # Assuming user picks from content/images or we convert path to relative
-            rel_path = os.path.relpath(path, os.path.join(self.repo_path, 'content', 'posts'))
-            # If outside, maybe warn?
-            
-            # Insert Markdown: ![name](path)
-            name = os.path.basename(path)
-            # Fix slash for markdown
-            rel_path = rel_path.replace("\\", "/")
-            
+        if not self.image_store: return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select Image", self.image_store.images_dir,
+                                                "Images (*.png *.jpg *.jpeg *.gif *.webp)")
+        links = []
+        for path in paths:
+            # Copied in under its content hash; a file inserted before
+            # resolves to the existing copy, and one already in
+            # content/images is indexed in place
+            try:
+                name, is_new = self.image_store.add(path)
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "Insert Image", str(e))
+                continue
+            entry = self.image_store.entry(name)
+            size = f" ({entry['width']}x{entry['height']}, {entry['bytes'] // 1024} KB)" if entry else ''
+            self.build_console.append(f"image: {os.path.basename(path)} -> {name}{size}"
+                                      f"{'' if is_new else ' (already stored)'}")
+            alt = os.path.splitext(os.path.basename(path))[0]
+            links.append(f"![{alt}]({self.image_store.link(name, self.manager.posts_dir)})")
+        if links:
             cursor = self.editor.textCursor()
-            cursor.insertText(f"![{name}]({rel_path})")
+            cursor.insertText("\n".join(links))
+
+    def _build_site(self, full=False):
+        if not self.site_builder: return
+        if self._site_worker:
+            # Coalesce clicks during a build into one rerun afterwards
+            self._site_queued = True
+            self.build_console.build_queued("Post previews")
+            return
+        builder = self.site_builder
+        started = time.perf_counter()
+        self._site_worker = Worker(builder.build, full)
+        self._site_worker.signals.finished.connect(self._on_site_built)
+        self._site_worker.signals.error.connect(
+            lambda msg: self._on_site_built(None, msg, time.perf_counter() - started))
+        self.build_status.setText("Rendering previews...")
+        self.build_console.build_started("Post previews")
+        QThreadPool.globalInstance().start(self._site_worker)
+
+    def _on_site_built(self, report, error=None, wall=0.0):
+        self._site_worker = None
+        if report is None:
+            self.build_status.setText(f"Preview render failed: {error}")
+            self.build_console.append(f"Post preview error: {error}")
+            self.build_console.build_finished("Post previews", 1, wall)
+        else:
+            self.build_status.setText(f"{len(report.written)} preview(s) written, {report.skipped} unchanged "
+                                      f"in {report.seconds:.2f}s")
+            self.build_status.setToolTip(self.site_builder.output_dir)
+            for target in report.written[:200]:
+                self.build_console.append(f"wrote {target}")
+            if len(report.written) > 200:
+                self.build_console.append(f"... and {len(report.written) - 200} more")
+            for target in report.removed:
+                self.build_console.append(f"removed {target}")
+            self.build_console.append(f"render cache: {report.cache_hits} hit(s), {report.cache_misses} miss(es)")
+            self.build_console.build_finished("Post previews", 0, report.seconds, report.cpu)
+            self._update_cache_stats()
+        if self._site_queued:
+            self._site_queued = False
+            self._build_site()
+
+    def _toggle_server(self):
+        if self.preview_host.is_running():
+            self.preview_host.stop()
+            self.serve_btn.setText("Start Preview Server")
+            self.serve_label.setText("")
+            return
+        if not self.site_builder: return
+        url = self._start_server()
+        QDesktopServices.openUrl(QUrl(url))
+
+    def _start_server(self):
+        url = self.preview_host.start(self.site_builder)
+        self.serve_btn.setText("Stop Preview Server")
+        previews = url.rstrip('/') + PREVIEW_PATH
+        self.serve_label.setText(f'Serving <a href="{url}">{url}</a> '
+                                 f'(post previews: <a href="{previews}">{PREVIEW_PATH}</a>)')
+        self.build_console.append(f"Preview server at {url}, post previews at {previews} (re-rendered on save)")
+        return url
+
+    def _on_preview_rebuilt(self, report, latency, clients):
+        if not report.written and not report.removed:
+            return
+        pages = report.written + report.removed
+        shown = ", ".join(pages[:5]) + (f" and {len(pages) - 5} more" if len(pages) > 5 else "")
+        self.build_console.append(f"preview: rebuilt {shown} in {latency * 1000:.0f} ms, "
+                                  f"reload sent to {clients} tab(s)")
+        self._update_cache_stats()
+
+    def _check_links(self, external):
+        if not self.link_checker or self._link_worker: return
+        checker = self.link_checker
+        checker.url_checker = HttpChecker() if external else None
+        self._link_worker = Worker(checker.check)
+        self._link_worker.signals.finished.connect(lambda report: self._on_links_checked(checker, report))
+        self._link_worker.signals.error.connect(lambda msg: self._on_links_checked(checker, None, msg))
+        self.link_panel.check_started()
+        QThreadPool.globalInstance().start(self._link_worker)
+
+    def _on_links_checked(self, checker, report, error=None):
+        self._link_worker = None
+        if checker is not self.link_checker:
+            self.link_panel.check_failed("repository changed")
+        elif report is None:
+            self.link_panel.check_failed(error)
+        else:
+            self.link_panel.show_report(report)
+
+    def _open_link_source(self, source, line):
+        # Posts open in the editor at the offending line; data.json is
+        # edited in the Profile tab
+        row = self.post_model.row_of(source) if self.manager else -1
+        if row < 0:
+            return
+        # Selecting the row loads the post; current_file only moves to it
+        # once that succeeded, so a failed load leaves Save on the old post
+        index = self.post_model.index(row, 0)
+        self.post_list.setCurrentIndex(index)
+        self.post_list.scrollTo(index)
+        if self.current_file != source:
+            return
+        block = self.editor.document().findBlockByNumber(line - 1)
+        if block.isValid():
+            cursor = QTextCursor(block)
+            self.editor.setTextCursor(cursor)
+            self.editor.centerCursor()
+            self.editor.setFocus()
 
     def _run_build(self):
-        if not self.repo_path: return
-        script = os.path.join(self.repo_path, 'scripts', 'manage_posts.py')
-        
-        self.process = QProcess()
-        self.process.setWorkingDirectory(self.repo_path)
-        self.process.start("python3", [script, "build"])
-        self.process.finished.connect(lambda: QMessageBox.information(self, "Build", "Build script finished! Check output."))
+        if not self.build_runner: return
+        outcome = self.build_runner.request()
+        if outcome == 'queued':
+            self.build_console.build_queued("Build script")
+        elif outcome == 'missing':
+            self.build_console.append("No scripts/manage_posts.py in this repository.")
+
+    def _on_build_finished(self, exit_code, wall, cpu):
+        self.build_console.build_finished("Build script", exit_code, wall, cpu)
+        if exit_code == 0:
+            self.preview_host.site_built()
@@ -0,0 +1,116 @@
+import codecs
+import os
+import subprocess
+import threading
+import time
+from PySide6.QtCore import QObject, Signal
+from models.publish import build_command
+from utils.git_jobs import LINE_RE
+
+
+def wait_with_cpu(process):
+    # Reap a subprocess.Popen -> (exit code, CPU seconds or None). wait4()
+    # gives the rusage of that one process (and whatever it reaped itself),
+    # unlike RUSAGE_CHILDREN, which also counts every other child this
+    # process happens to reap meanwhile (git polls, publish runs).
+    if not hasattr(os, 'wait4'):  # Windows: CPU time is not reported
+        return process.wait(), None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # Already reaped by Popen.poll() (a kill() racing the exit)
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage.ru_utime + usage.ru_stime
+
+
+# Runs the site's build script and streams its output. One build at a
+# time: a request while one is running is queued, and repeated requests
+# collapse into that single queued rerun. The script runs under Popen with
+# a reader thread (QProcess reaps its children itself, so their rusage
+# can't be had); results come back to the GUI thread through signals.
+class BuildRunner(QObject):
+    output = Signal(str)
+    started = Signal()
+    finished = Signal(int, float, object)   # exit code (-1: crashed/failed to start), wall s, CPU s or None
+    _exited = Signal(object, int, float, object)  # process, exit code, wall s, CPU s
+
+    def __init__(self, repo_path, parent=None):
+        super().__init__(parent)
+        self.repo_path = repo_path
+        self.process = None
+        self.queued = False
+        self._exited.connect(self._on_exited)
+
+    def is_busy(self):
+        return self.process is not None
+
+    def request(self):
+        # -> 'started', 'queued' or 'missing' (no build script)
+        if self.process:
+            self.queued = True
+            return 'queued'
+        if not self._start():
+            return 'missing'
+        return 'started'
+
+    def cancel(self):
+        self.queued = False
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+
+    def _start(self):
+        command = build_command(self.repo_path)
+        if not command:
+            return False
+        self.started.emit()
+        self.output.emit(f"$ {' '.join(command)}")
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, cwd=self.repo_path, stdin=subprocess.DEVNULL,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as e:
+            self.output.emit(f"Could not start build: {e}")
+            self.finished.emit(-1, time.perf_counter() - start, None)
+            return True
+        self.process = process
+        threading.Thread(target=self._run, args=(process, start), daemon=True).start()
+        return True
+
+    def _run(self, process, start):
+        # Reader thread: stream lines until EOF, then reap the process
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        buffer = ''
+        while True:
+            chunk = process.stdout.read1(65536)
+            buffer += decoder.decode(chunk, final=not chunk)
+            end = 0
+            for m in LINE_RE.finditer(buffer):
+                end = m.end()
+                if m.group(1):
+                    self._emit(self.output, m.group(1))
+            buffer = buffer[end:]
+            if not chunk:
+                break
+        if buffer:
+            self._emit(self.output, buffer)
+        process.stdout.close()
+        code, cpu = wait_with_cpu(process)
+        self._emit(self._exited, process, code, time.perf_counter() - start, cpu)
+
+    @staticmethod
+    def _emit(signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            pass    # runner deleted (repository switched) while the build ran
+
+    def _on_exited(self, process, exit_code, wall, cpu):
+        if process is not self.process:
+            return
+        self.process = None
+        # Killed by a signal: reported like a crash
+        self.finished.emit(exit_code if exit_code >= 0 else -1, wall, cpu)
+        if self.queued:
+            self.queued = False
+            self._start()
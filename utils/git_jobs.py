@@ -0,0 +1,129 @@
+import re
+from collections import deque
+from PySide6.QtCore import QObject, QProcess, QProcessEnvironment, Signal
+
+# Keep at most this much output per job for the finished() report
+MAX_CAPTURE = 64 * 1024
+
+LINE_RE = re.compile(r'([^\r\n]*)(\r\n|\r|\n)')
+
+
+# Runs git commands one after another through QProcess, so the GUI thread
+# never waits on the network. Output (including --progress, which git
+# writes to stderr with '\r' updates) is streamed line by line.
+class GitJobRunner(QObject):
+    output = Signal(str, bool)          # line, is an in-place progress update
+    started = Signal(str)               # label
+    finished = Signal(str, int, str)    # label, exit code (-1: cancelled/failed), output
+    queue_changed = Signal(int)         # jobs waiting, excluding the running one
+
+    def __init__(self, git_exec, repo_path, parent=None):
+        super().__init__(parent)
+        self.git_exec = git_exec
+        self.repo_path = repo_path
+        self.queue = deque()
+        self.process = None
+        self.current = None
+        self._buffer = ''
+        self._captured = deque()
+        self._captured_chars = 0
+        self._cancelled = False
+
+    def submit(self, label, args, callback=None, stop_queue_on_error=True):
+        # callback(exit_code, output) runs after finished() is emitted.
+        # A failing job drops whatever was queued behind it (a push after
+        # a failed commit) unless stop_queue_on_error is False.
+        self.queue.append((label, list(args), callback, stop_queue_on_error))
+        self.queue_changed.emit(len(self.queue))
+        if not self.process:
+            self._start_next()
+
+    def is_busy(self):
+        return self.process is not None
+
+    def cancel(self):
+        # Kill the running job and forget the queued ones
+        self.queue.clear()
+        self.queue_changed.emit(0)
+        if self.process:
+            self._cancelled = True
+            self.process.kill()
+
+    def _start_next(self):
+        if not self.queue:
+            return
+        self.current = self.queue.popleft()
+        self.queue_changed.emit(len(self.queue))
+        label, args = self.current[0], self.current[1]
+        self._buffer = ''
+        self._captured = deque()
+        self._captured_chars = 0
+        self._cancelled = False
+
+        self.process = QProcess(self)
+        self.process.setProgram(self.git_exec)
+        self.process.setArguments(args)
+        self.process.setWorkingDirectory(self.repo_path)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        env = QProcessEnvironment.systemEnvironment()
+        # Nobody can answer a terminal prompt here; fail instead of hanging
+        env.insert('GIT_TERMINAL_PROMPT', '0')
+        self.process.setProcessEnvironment(env)
+        self.process.readyReadStandardOutput.connect(self._on_output)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+
+        self.started.emit(label)
+        self.output.emit(f"$ git {' '.join(args)}", False)
+        self.process.start()
+
+    def _on_output(self):
+        data = bytes(self.process.readAllStandardOutput()).decode('utf-8', 'replace')
+        self._buffer += data
+        end = 0
+        for m in LINE_RE.finditer(self._buffer):
+            end = m.end()
+            if m.group(1):
+                self._emit_line(m.group(1), m.group(2) == '\r')
+        self._buffer = self._buffer[end:]
+
+    def _emit_line(self, line, progress):
+        if not progress:
+            # Running total: a long fetch log shouldn't cost O(n^2)
+            self._captured.append(line)
+            self._captured_chars += len(line)
+            while self._captured_chars > MAX_CAPTURE and len(self._captured) > 1:
+                self._captured_chars -= len(self._captured.popleft())
+        self.output.emit(line, progress)
+
+    def _on_error(self, error):
+        # finished() is not emitted when the process never started
+        if error == QProcess.FailedToStart:
+            self.output.emit(f"Could not start {self.git_exec}: {self.process.errorString()}", False)
+            self._finish(-1)
+
+    def _on_finished(self, exit_code, exit_status):
+        if self._buffer:
+            self._emit_line(self._buffer, False)
+            self._buffer = ''
+        if self._cancelled:
+            self.output.emit("Cancelled.", False)
+            exit_code = -1
+        elif exit_status != QProcess.NormalExit:
+            exit_code = -1
+        self._finish(exit_code)
+
+    def _finish(self, exit_code):
+        label, _, callback, stop_queue_on_error = self.current
+        output = '\n'.join(self._captured)
+        self.process.deleteLater()
+        self.process = None
+        self.current = None
+        if exit_code != 0 and stop_queue_on_error and self.queue:
+            self.output.emit(f"Skipping {len(self.queue)} queued job(s) after failure.", False)
+            self.queue.clear()
+            self.queue_changed.emit(0)
+        self.finished.emit(label, exit_code, output)
+        if callback:
+            callback(exit_code, output)
+        self._start_next()
@@ -0,0 +1,65 @@
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+# inotify watches are a per-user resource; beyond this many posts we rely on
+# directory events only (renames, git checkouts and atomic saves still fire)
+MAX_FILE_WATCHES = 2000
+
+
+class PostWatcher(QObject):
+    # Emitted once per burst of filesystem events in the posts directory
+    changed = Signal()
+
+    def __init__(self, parent=None, delay_ms=250):
+        super().__init__(parent)
+        self.posts_dir = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._schedule)
+        self.watcher.fileChanged.connect(self._schedule)
+
+        # A git pull fires many events; restart the timer on each one so
+        # listeners see a single notification after things settle
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self._flush)
+
+    def watch(self, posts_dir):
+        self.stop()
+        if not os.path.isdir(posts_dir):
+            return
+        self.posts_dir = posts_dir
+        self.watcher.addPath(posts_dir)
+        self._sync_file_watches()
+
+    def stop(self):
+        self.timer.stop()
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.posts_dir = None
+
+    def _schedule(self, path):
+        self.timer.start()
+
+    def _flush(self):
+        if not self.posts_dir:
+            return
+        self._sync_file_watches()
+        self.changed.emit()
+
+    def _sync_file_watches(self):
+        # Deleted or rename-replaced files lose their watch; re-add what is
+        # on disk now and drop watches for files that are gone
+        try:
+            names = sorted(n for n in os.listdir(self.posts_dir) if n.endswith('.md'))
+        except OSError:
+            return
+        wanted = {os.path.join(self.posts_dir, n) for n in names[:MAX_FILE_WATCHES]}
+        current = set(self.watcher.files())
+        stale = list(current - wanted)
+        fresh = list(wanted - current)
+        if stale:
+            self.watcher.removePaths(stale)
+        if fresh:
+            self.watcher.addPaths(fresh)
@@ -0,0 +1,35 @@
+from PySide6.QtCore import QObject, Signal
+from models.preview_server import PreviewServer
+
+
+# Owns a PreviewServer for the GUI. The server reports from its rebuild
+# thread; emitting these signals queues the reports to the GUI.
+class PreviewHost(QObject):
+    rebuilt = Signal(object, float, int)    # BuildReport, save-to-notify seconds, open tabs
+    error = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = None
+
+    def start(self, builder):
+        # -> the URL being served
+        self.stop()
+        self.server = PreviewServer(builder, on_rebuilt=self.rebuilt.emit, on_error=self.error.emit)
+        return self.server.start()
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
+            self.server = None
+
+    def is_running(self):
+        return self.server is not None
+
+    def source_saved(self, source):
+        if self.server:
+            self.server.request_rebuild(source)
+
+    def site_built(self):
+        if self.server:
+            self.server.site_built()
@@ -0,0 +1,34 @@
+from PySide6.QtCore import QObject, QThreadPool, Signal
+from models.publish import PublishPipeline
+from utils.workers import Worker
+
+
+# Runs a PublishPipeline on the thread pool. The pipeline's callbacks fire
+# on the worker thread; emitting these signals queues them to the GUI.
+class PublishJob(QObject):
+    output = Signal(str, bool)          # line, is an in-place progress update
+    stage_finished = Signal(object)     # StageResult
+    finished = Signal(object)           # [StageResult]
+
+    def __init__(self, manager, message=None, stamp_path=None, timing_log=None, parent=None):
+        super().__init__(parent)
+        self.pipeline = PublishPipeline(
+            manager, message, stamp_path, timing_log,
+            on_output=self.output.emit, on_stage=self.stage_finished.emit)
+        self._worker = None
+
+    def start(self):
+        self._worker = Worker(self.pipeline.run)
+        self._worker.signals.finished.connect(self._on_done)
+        self._worker.signals.error.connect(lambda msg: self._on_done(self.pipeline.results))
+        QThreadPool.globalInstance().start(self._worker)
+
+    def is_running(self):
+        return self._worker is not None
+
+    def cancel(self):
+        self.pipeline.cancel()
+
+    def _on_done(self, results):
+        self._worker = None
+        self.finished.emit(results)
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 from PySide6.QtCore import QStandardPaths
@@ -24,3 +25,35 @@ class SettingsManager:
             
     def get_repo_path(self):
         return self.load_settings().get("repo_path", "")
+
+    def get_index_path(self, repo_path):
+        # One cache file per repository so switching repos never mixes posts
+        key = hashlib.sha1(os.path.abspath(repo_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.config_dir, 'cache', f'posts_{key}.sqlite')
+
+    def get_image_index_path(self, repo_path):
+        # Stored images' digests and dimensions, kept out of the repository
+        key = hashlib.sha1(os.path.abspath(repo_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.config_dir, 'cache', f'images_{key}.json')
+
+    def get_build_stamp_path(self, repo_path):
+        # Build inputs at the last successful publish build
+        key = hashlib.sha1(os.path.abspath(repo_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.config_dir, 'cache', f'build_{key}.stamp')
+
+    def get_publish_log_path(self):
+        # One JSON line of stage timings per publish run
+        return os.path.join(self.config_dir, 'publish_times.jsonl')
+
+    def get_site_dir(self, repo_path):
+        # Rendered post previews (SiteBuilder), kept out of the repository
+        key = hashlib.sha1(os.path.abspath(repo_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.config_dir, 'cache', f'site_{key}')
+
+    def get_build_log_path(self):
+        # One JSON line per build: label, exit code, wall and CPU seconds
+        return os.path.join(self.config_dir, 'build_times.jsonl')
+
+    def get_render_cache_path(self):
+        # Rendered Markdown by content hash; shared by every repository
+        return os.path.join(self.config_dir, 'cache', 'render.sqlite')
@@ -28,7 +28,7 @@ def apply_dark_theme(app):
             background-color: #2a82da; 
             border: 1px solid white; 
         }
-        QTextEdit, QPlainTextEdit, QListWidget {
+        QTextEdit, QPlainTextEdit, QListView {
             background-color: #1e1e1e;
             color: #dcdcdc;
             border: 1px solid #3e3e3e;